@@ -2,10 +2,36 @@
 
 import os
 import sys
+import atexit
+import asyncio
+import signal
+import functools
+import itertools
+import json
+import io
+import contextlib
+import shutil
+import socket
+import tempfile
 import subprocess
-import glob
+import re
+import bisect
+import math
+from array import array
+import heapq
+import hashlib
+import unicodedata
+import urllib.parse
+import sqlite3
 import random
 import threading
+import errno
+import select
+import struct
+import ctypes
+import importlib.util
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 import time
 try:
     from colorama import init, Fore, Back, Style
@@ -13,15 +39,2456 @@ try:
 except ImportError:
     COLORAMA_AVAILABLE = False
     
-try:
-    from mutagen import File
-    MUTAGEN_AVAILABLE = True
-except ImportError:
-    MUTAGEN_AVAILABLE = False
+# Mutagen yalnızca etiket okunurken yüklenir (açılışı yavaşlatmasın)
+MUTAGEN_AVAILABLE = importlib.util.find_spec("mutagen") is not None
+# NumPy de yalnızca dalga formu hesaplanırken yüklenir
+NUMPY_AVAILABLE = importlib.util.find_spec("numpy") is not None
 
 __version__ = "1.0.0"
 
+
+class Histogram:
+    """Süreleri 2'nin kuvveti genişliğinde mikrosaniye kovalarında tutar (sabit bellek)"""
+
+    BUCKETS = 40
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+        self.buckets = [0] * self.BUCKETS
+
+    def add(self, seconds, n=1):
+        """n adet ölçümü (her biri seconds süren) ekler"""
+        bucket = min(int(seconds * 1e6).bit_length(), self.BUCKETS - 1)
+        self.buckets[bucket] += n
+        self.count += n
+        self.total += seconds * n
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, fraction):
+        """Yaklaşık yüzdelik: ölçümün düştüğü kovanın üst sınırı (en çok max)"""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= rank:
+                return min((1 << bucket) / 1e6, self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else None,
+            "min": self.min,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "max": self.max,
+        }
+
+
+class Metrics:
+    """Sık kullanılan işlemlerin süre histogramları ve sayaçları (thread'lerden güvenle kaydedilir)"""
+
+    def __init__(self):
+        self.histograms = {}
+        self.counters = {}
+        self.lock = threading.Lock()
+
+    def record(self, name, seconds, n=1):
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.add(seconds, n)
+
+    def count(self, name, n=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def to_dict(self):
+        with self.lock:
+            return {
+                "histograms": {name: h.to_dict() for name, h in sorted(self.histograms.items())},
+                "counters": dict(sorted(self.counters.items())),
+            }
+
+    def dump(self, path):
+        """Ölçümleri JSON olarak yazar"""
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+# Oturum boyunca toplanan performans ölçümleri ('stats' komutu gösterir)
+metrics = Metrics()
+
+
+def format_duration(seconds):
+    """Süreyi okunabilir birimle yazar (µs, ms, sn)"""
+    if seconds is None:
+        return "-"
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.0f} µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:.1f} ms"
+    return f"{seconds:.2f} sn"
+
+
+class MpvBackend:
+    """Tek bir mpv sürecini JSON IPC soketi üzerinden yönetir
+
+    Soket asyncio olay döngüsüne bağlanır; olaylar ve yanıtlar döngüde işlenir,
+    bu yüzden tüm metotlar olay döngüsünden çağrılmalıdır.
+    """
+
+    CONNECT_INTERVAL = 0.01   # Soket oluşana kadar bağlantı denemeleri arası (sn)
+    CONNECT_TIMEOUT = 5.0
+
+    def __init__(self, mpv_path="mpv", socket_path=None, loop=None):
+        self.mpv_path = mpv_path
+        self.socket_path = socket_path or os.path.join(
+            tempfile.gettempdir(), f"termus-mpv-{os.getpid()}.sock")
+        self.loop = loop
+        self.process = None
+        self.sock = None
+        # Olay geldiğinde olay döngüsünde çağrılır
+        self.on_event = None
+        # observe_property ile izlenen özelliklerin son değerleri
+        self.properties = {}
+        self._observed = {}
+        # Bağlantı kurulana kadar gönderilen komutlar burada bekler
+        self._outbox = []
+        self._buffer = b""
+        self._connect_timer = None
+        self._connect_deadline = 0.0
+
+    def is_alive(self):
+        """mpv süreci çalışıyor mu (soket henüz bağlanıyor olabilir)"""
+        return self.process is not None and self.process.poll() is None
+
+    def start(self, volume=50):
+        """mpv'yi boşta bekleme modunda başlatır; sokete bağlanmayı beklemeden döner
+
+        Bağlantı kurulana kadar gönderilen komutlar sıraya alınır ve bağlanınca iletilir.
+        """
+        if self.is_alive():
+            return
+        self.close()
+        if self.loop is None:
+            self.loop = asyncio.get_running_loop()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+        self.process = subprocess.Popen(
+            [self.mpv_path, '--idle=yes', '--no-video', '--no-terminal',
+             '--gapless-audio=weak', '--prefetch-playlist=yes',
+             f'--volume={volume}', f'--input-ipc-server={self.socket_path}'],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        metrics.count("spawn.mpv")
+        self.properties = {}
+        self._connect_deadline = time.monotonic() + self.CONNECT_TIMEOUT
+        self._connect()
+
+    def _connect(self):
+        """IPC soketine bağlanmayı dener, soket henüz yoksa zamanlayıcıyla yeniden dener"""
+        self._connect_timer = None
+        if self.process is None:
+            return
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            error = None
+            if self.process.poll() is not None:
+                error = "mpv başlatılamadı"
+            elif time.monotonic() > self._connect_deadline:
+                self.process.kill()
+                error = "mpv IPC soketi açılmadı"
+            if error:
+                self._outbox = []
+                if self.on_event:
+                    self.on_event({'event': 'shutdown', 'error': error})
+                return
+            self._connect_timer = self.loop.call_later(self.CONNECT_INTERVAL, self._connect)
+            return
+
+        self.sock = sock
+        self._buffer = b""
+        self.loop.add_reader(sock.fileno(), self._on_readable)
+
+        # Yeni süreçte izlenen özellikleri yeniden kaydet, bekleyen komutları gönder
+        outbox, self._outbox = self._outbox, []
+        for name, observe_id in self._observed.items():
+            self._send(("observe_property", observe_id, name))
+        for payload in outbox:
+            self._write(payload)
+
+    def _on_readable(self):
+        """Soketten gelen JSON satırlarını okur (olay döngüsü soket okunabilir olunca çağırır)"""
+        sock = self.sock
+        if sock is None:
+            return
+        try:
+            data = sock.recv(65536)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            # Bağlantı koptu
+            self.close()
+            if self.on_event:
+                self.on_event({'event': 'shutdown'})
+            return
+
+        self._buffer += data
+        while b"\n" in self._buffer:
+            line, self._buffer = self._buffer.split(b"\n", 1)
+            if line:
+                self._dispatch(line)
+
+    def _dispatch(self, line):
+        """Gelen olayı olay işleyicisine iletir (komut yanıtları beklenmez)"""
+        try:
+            message = json.loads(line)
+        except ValueError:
+            return
+
+        if 'event' in message:
+            if message['event'] == 'property-change':
+                self.properties[message.get('name')] = message.get('data')
+            if self.on_event:
+                self.on_event(message)
+
+    def _write(self, payload):
+        try:
+            self.sock.sendall(payload)
+        except OSError:
+            pass
+
+    def _send(self, args):
+        if self.process is None:
+            raise RuntimeError("mpv çalışmıyor")
+        payload = json.dumps({"command": list(args)}, ensure_ascii=False)
+        payload = payload.encode("utf-8", "surrogateescape") + b"\n"
+        if self.sock is None:
+            self._outbox.append(payload)
+        else:
+            self._write(payload)
+
+    def send(self, *args):
+        """Komutu gönderir, yanıtı beklemez"""
+        self._send(args)
+
+    def observe(self, name):
+        """Özelliği izlemeye alır, değişiklikler property-change olayı olarak gelir"""
+        if name in self._observed:
+            return
+        self._observed[name] = len(self._observed) + 1
+        if self.sock is not None:
+            self.send("observe_property", self._observed[name], name)
+
+    def loadfile(self, path, mode="replace"):
+        """Dosyayı yükler (replace: hemen çal, append: sıraya ekle)"""
+        self.send("loadfile", path, mode)
+
+    def set_volume(self, volume):
+        self.send("set_property", "volume", volume)
+
+    def set_pause(self, paused):
+        self.send("set_property", "pause", paused)
+
+    def seek(self, seconds, mode="relative"):
+        self.send("seek", seconds, mode)
+
+    def stop(self):
+        """Çalmayı durdurur, mpv boşta beklemeye devam eder"""
+        self.send("stop")
+
+    def close(self):
+        """Soket bağlantısını kapatır"""
+        if self._connect_timer is not None:
+            self._connect_timer.cancel()
+            self._connect_timer = None
+        if self.sock is not None:
+            if self.loop is not None and not self.loop.is_closed():
+                self.loop.remove_reader(self.sock.fileno())
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+            self.sock = None
+
+    def quit(self):
+        """mpv sürecini kapatır"""
+        if self.is_alive():
+            try:
+                if self.sock is None:
+                    raise RuntimeError("mpv henüz bağlanmadı")
+                self.send("quit")
+                self.process.wait(timeout=2)
+            except (OSError, RuntimeError, subprocess.TimeoutExpired):
+                self.process.kill()
+        self.close()
+        self.process = None
+        self._outbox = []
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+def env_int(name, default):
+    """Tam sayı ortam değişkenini okur (yoksa veya geçersizse varsayılan)"""
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def cache_dir():
+    """Termus'un önbellek dizinini döndürür (~/.cache/termus)"""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "termus")
+
+
+class LibraryIndex:
+    """Müzik dosyalarını diskteki SQLite indeksinde tutar, yalnızca değişen dizinleri yeniden tarar"""
+
+    # Tarama farkları bu kadar dizinde bir tek işlemle yazılır
+    APPLY_BATCH = 256
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS dirs (
+            path TEXT PRIMARY KEY,
+            parent TEXT NOT NULL,
+            root TEXT NOT NULL,
+            mtime INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS dirs_root ON dirs(root);
+        CREATE TABLE IF NOT EXISTS tracks (
+            id INTEGER PRIMARY KEY,
+            path TEXT UNIQUE NOT NULL,
+            dir TEXT NOT NULL,
+            mtime INTEGER NOT NULL,
+            size INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS tracks_dir ON tracks(dir);
+        CREATE TABLE IF NOT EXISTS tags (
+            track_id INTEGER PRIMARY KEY,
+            mtime INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            artist TEXT,
+            title TEXT,
+            album TEXT,
+            length REAL,
+            bitrate INTEGER,
+            sample_rate INTEGER
+        );
+        CREATE TABLE IF NOT EXISTS hashes (
+            track_id INTEGER PRIMARY KEY,
+            mtime INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            partial BLOB,
+            full BLOB
+        );
+    """
+
+    def __init__(self, extensions, db_path=None):
+        self.extensions = tuple(extensions)
+        self.db_path = db_path or os.path.join(cache_dir(), "library.db")
+        self.lock = threading.RLock()
+        try:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            self.db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self.db.execute("PRAGMA journal_mode=WAL")
+        except (OSError, sqlite3.Error):
+            # Önbellek dizini yazılamıyorsa indeks yalnızca bu oturum için tutulur
+            self.db = sqlite3.connect(":memory:", check_same_thread=False)
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(self.SCHEMA)
+
+    @staticmethod
+    def _subtree_range(path):
+        """path altındaki yolları seçmek için [alt, üst) aralığı ('/' + 1 = '0')"""
+        prefix = os.path.join(path, "")
+        return prefix, prefix[:-1] + "0"
+
+    def scan(self, root, force_dirs=(), changes=None, progress=None):
+        """root altındaki değişiklikleri indekse uygular, (eklenen, silinen, güncellenen) sayılarını döndürür
+
+        force_dirs içindeki dizinler değiştirilme zamanı aynı olsa da yeniden listelenir.
+        changes sözlüğü verilirse "added", "removed", "updated" yol listeleriyle doldurulur.
+        Dosya sistemi kilit tutulmadan gezilir, farklar APPLY_BATCH dizinlik kısa işlemlerle
+        yazılır; böylece farklı kökler aynı anda taranabilir ve yavaş bir bağlama noktası
+        diğerlerini bekletmez. progress verilirse her yazmadan sonra çağrılır; records()
+        o ana kadarki (kısmi) sonucu döndürür.
+        """
+        root = os.path.abspath(root)
+        if changes is None:
+            changes = {}
+        for key in ("added", "removed", "updated"):
+            changes.setdefault(key, [])
+
+        # Bilinen dizinler ve alt dizinleri
+        known_dirs = {}
+        children = {}
+        with self.lock:
+            for path, parent, mtime in self.db.execute(
+                    "SELECT path, parent, mtime FROM dirs WHERE root = ?", (root,)):
+                known_dirs[path] = mtime
+                children.setdefault(parent, []).append(path)
+
+        # (yol, mtime, dosyalar, alt dizinler); dosyalar None ise dizin silinmiştir
+        batch = []
+
+        def flush():
+            with self.lock, self.db:
+                for path, mtime, files, subdirs in batch:
+                    if files is None:
+                        self._remove_tree(path, changes)
+                    else:
+                        self._apply_dir(root, path, mtime, files, subdirs, children.get(path, ()), changes)
+            del batch[:]
+            if progress is not None:
+                progress()
+
+        try:
+            stack = [(root, os.stat(root).st_mtime_ns)]
+        except OSError:
+            stack = []
+            batch.append((root, None, None, None))
+
+        while stack:
+            path, mtime = stack.pop()
+            if known_dirs.get(path) == mtime and path not in force_dirs:
+                # Dizin değişmemiş: listelemeden yalnızca alt dizinlerine bak
+                for child in children.get(path, ()):
+                    try:
+                        stack.append((child, os.stat(child).st_mtime_ns))
+                    except OSError:
+                        batch.append((child, None, None, None))
+                continue
+
+            files, subdirs = self._list_dir(path)
+            batch.append((path, mtime, files, subdirs))
+            stack.extend(subdirs)
+            if len(batch) >= self.APPLY_BATCH:
+                flush()
+        if batch:
+            flush()
+
+        # Silinen dosyaların etiketlerini ve özetlerini de temizle
+        if changes["removed"]:
+            with self.lock, self.db:
+                self.db.execute("DELETE FROM tags WHERE track_id NOT IN (SELECT id FROM tracks)")
+                self.db.execute("DELETE FROM hashes WHERE track_id NOT IN (SELECT id FROM tracks)")
+
+        return len(changes["added"]), len(changes["removed"]), len(changes["updated"])
+
+    def _list_dir(self, path):
+        """Dizindeki müzik dosyalarını {yol: (mtime, boyut)} ve alt dizinleri [(yol, mtime)] olarak döndürür"""
+        files = {}
+        subdirs = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append((entry.path, entry.stat(follow_symlinks=False).st_mtime_ns))
+                        elif entry.name.endswith(self.extensions) and entry.is_file():
+                            entry.path.encode()
+                            st = entry.stat()
+                            files[entry.path] = (st.st_mtime_ns, st.st_size)
+                    except (OSError, UnicodeEncodeError):
+                        continue
+        except OSError:
+            pass
+        return files, subdirs
+
+    def _apply_dir(self, root, path, mtime, files, subdirs, known_children, changes):
+        """Listelenen dizinin indeksteki kayıtlarıyla farkını uygular"""
+        known = {p: (m, s) for p, m, s in self.db.execute(
+            "SELECT path, mtime, size FROM tracks WHERE dir = ?", (path,))}
+        new = [p for p in files if p not in known]
+        gone = [p for p in known if p not in files]
+        changed = [p for p, stat in files.items() if p in known and known[p] != stat]
+
+        self.db.executemany("INSERT INTO tracks (path, dir, mtime, size) VALUES (?, ?, ?, ?)",
+                            [(p, path) + files[p] for p in new])
+        self.db.executemany("DELETE FROM tracks WHERE path = ?", [(p,) for p in gone])
+        self.db.executemany("UPDATE tracks SET mtime = ?, size = ? WHERE path = ?",
+                            [files[p] + (p,) for p in changed])
+        changes["added"].extend(new)
+        changes["removed"].extend(gone)
+        changes["updated"].extend(changed)
+
+        # Silinen alt dizinler
+        current = {p for p, _ in subdirs}
+        for child in known_children:
+            if child not in current:
+                self._remove_tree(child, changes)
+
+        self.db.execute("INSERT OR REPLACE INTO dirs (path, parent, root, mtime) VALUES (?, ?, ?, ?)",
+                        (path, os.path.dirname(path), root, mtime))
+
+    def _remove_tree(self, path, changes):
+        """Dizini ve altındaki tüm kayıtları siler"""
+        low, high = self._subtree_range(path)
+        changes["removed"].extend(row[0] for row in self.db.execute(
+            "SELECT path FROM tracks WHERE path >= ? AND path < ?", (low, high)))
+        self.db.execute("DELETE FROM tracks WHERE path >= ? AND path < ?", (low, high))
+        self.db.execute("DELETE FROM dirs WHERE path = ? OR (path >= ? AND path < ?)", (path, low, high))
+
+    def pending_tags(self):
+        """Etiketi hiç okunmamış veya okunduktan sonra değişmiş dosyaları döndürür"""
+        with self.lock:
+            return self.db.execute(
+                "SELECT t.id, t.path, t.mtime, t.size FROM tracks t "
+                "LEFT JOIN tags g ON g.track_id = t.id "
+                "WHERE g.track_id IS NULL OR g.mtime != t.mtime OR g.size != t.size").fetchall()
+
+    def store_tags(self, rows):
+        """read_tags_batch sonuçlarını tek işlemde yazar"""
+        with self.lock, self.db:
+            self.db.executemany("INSERT OR REPLACE INTO tags VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def duplicate_candidates(self, roots):
+        """roots altındaki boş olmayan dosyaları kopya araması için döndürür
+
+        Satırlar (id, yol, mtime, boyut, süre, baş-son özeti, tam özet) biçimindedir;
+        dosya etiket okunduktan veya özetlendikten sonra değiştiyse süre ve özetler None'dur.
+        """
+        rows = []
+        with self.lock:
+            for root in roots:
+                low, high = self._subtree_range(os.path.abspath(root))
+                rows.extend(self.db.execute(
+                    "SELECT t.id, t.path, t.mtime, t.size, g.length, h.partial, h.full FROM tracks t "
+                    "LEFT JOIN tags g ON g.track_id = t.id AND g.mtime = t.mtime AND g.size = t.size "
+                    "LEFT JOIN hashes h ON h.track_id = t.id AND h.mtime = t.mtime AND h.size = t.size "
+                    "WHERE t.path >= ? AND t.path < ? AND t.size > 0", (low, high)))
+        return rows
+
+    def store_hashes(self, rows):
+        """(id, mtime, boyut, baş-son özeti, tam özet) satırlarını tek işlemde yazar"""
+        with self.lock, self.db:
+            self.db.executemany("INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?)", rows)
+
+    def records(self, root):
+        """root altındaki dosyaları (yol, sanatçı, başlık, albüm) olarak yola göre sıralı döndürür"""
+        low, high = self._subtree_range(os.path.abspath(root))
+        with self.lock:
+            return self.db.execute(
+                "SELECT t.path, g.artist, g.title, g.album FROM tracks t "
+                "LEFT JOIN tags g ON g.track_id = t.id "
+                "WHERE t.path >= ? AND t.path < ? ORDER BY t.path", (low, high)).fetchall()
+
+    def count(self, root):
+        """root altındaki dosya sayısı"""
+        low, high = self._subtree_range(os.path.abspath(root))
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM tracks WHERE path >= ? AND path < ?",
+                                   (low, high)).fetchone()[0]
+
+
+def merge_records(record_lists):
+    """Yola göre sıralı kayıt listelerini tek sıralı listede birleştirir, aynı yolu bir kez alır"""
+    merged = []
+    last = None
+    for record in heapq.merge(*record_lists, key=lambda record: record[0]):
+        if record[0] != last:
+            merged.append(record)
+            last = record[0]
+    return merged
+
+
+def normalize_roots(paths):
+    """Kök dizinleri mutlak yola çevirir; tekrarlananları ve başka bir kökün altında kalanları atar"""
+    roots = []
+    for path in sorted({os.path.abspath(os.path.expanduser(p)) for p in paths}):
+        # Sıralı listede bir kökün alt dizinleri hemen arkasından gelir
+        if roots and (path == roots[-1] or path.startswith(os.path.join(roots[-1], ""))):
+            continue
+        roots.append(path)
+    return roots
+
+
+class LibraryRoot:
+    """Bir kütüphane kökünün tarama durumu"""
+
+    def __init__(self, path):
+        self.path = path
+        self.scanning = False
+        self.files = 0
+        self.elapsed = None     # Son taramanın süresi (sn)
+        self.scanned_at = None  # Son taramanın bittiği an (time.time)
+        self.error = None
+
+    def status(self):
+        if self.scanning:
+            return "taranıyor"
+        if self.error:
+            return f"hata: {self.error}"
+        if not os.path.isdir(self.path):
+            return "bulunamadı"
+        if self.scanned_at is None:
+            return "taranmadı"
+        return f"{self.files} dosya, {format_duration(self.elapsed)}"
+
+
+class LibraryWatcher:
+    """Müzik dizinini Linux inotify ile izler, değişiklikleri kısa bir sessizlikten sonra toplu bildirir"""
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_ONLYDIR
+    EVENT = struct.Struct("iIII")
+
+    QUIET = 0.5       # Son olaydan sonra beklenen sessizlik (sn)
+    MAX_DELAY = 3.0   # Olaylar sürse de en geç bu kadar sonra bildir (sn)
+
+    def __init__(self, on_change):
+        # on_change(dizinler) değişen dizinlerin kümesiyle izleyici thread'inden çağrılır
+        self.on_change = on_change
+        self.libc = None
+        self.fd = None
+        self.roots = []
+        self.watches = {}
+        self.thread = None
+        self.wake_pipe = None
+        self.limit_reached = False
+
+    @classmethod
+    def available(cls):
+        return sys.platform.startswith("linux")
+
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self, roots):
+        """Kök dizinleri ve tüm alt dizinlerini izlemeye başlar"""
+        self.stop()
+        if self.libc is None:
+            # Python'un kendi bağlı olduğu libc (find_library alt süreç başlatır)
+            self.libc = ctypes.CDLL(None, use_errno=True)
+        fd = self.libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify başlatılamadı")
+        self.fd = fd
+        self.roots = [os.path.abspath(root) for root in roots]
+        self.watches = {}
+        self.limit_reached = False
+        for root in self.roots:
+            self._watch_tree(root)
+
+        self.wake_pipe = os.pipe()
+        self.thread = threading.Thread(target=self._run, args=(fd, self.wake_pipe[0]))
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        """İzlemeyi durdurur"""
+        if self.thread is not None:
+            os.write(self.wake_pipe[1], b"x")
+            self.thread.join()
+            self.thread = None
+            for pipe_fd in self.wake_pipe:
+                os.close(pipe_fd)
+            self.wake_pipe = None
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+        self.watches = {}
+
+    def _watch_tree(self, top):
+        """Dizini ve alt dizinlerini izleme listesine ekler"""
+        stack = [top]
+        while stack and not self.limit_reached:
+            path = stack.pop()
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), self.MASK)
+            if wd < 0:
+                # Çoğunlukla fs.inotify.max_user_watches sınırı
+                if ctypes.get_errno() == errno.ENOSPC:
+                    self.limit_reached = True
+                continue
+            self.watches[wd] = path
+            try:
+                with os.scandir(path) as entries:
+                    stack.extend(e.path for e in entries if e.is_dir(follow_symlinks=False))
+            except OSError:
+                pass
+
+    def _run(self, fd, wake_fd):
+        changed = set()
+        first = last = 0.0
+        while True:
+            timeout = None
+            if changed:
+                now = time.monotonic()
+                timeout = max(0.0, min(last + self.QUIET, first + self.MAX_DELAY) - now)
+            readable, _, _ = select.select([fd, wake_fd], [], [], timeout)
+            if wake_fd in readable:
+                return
+            if fd in readable:
+                now = time.monotonic()
+                if not changed:
+                    first = now
+                last = now
+                self._read_events(fd, changed)
+                continue
+            if changed:
+                batch, changed = changed, set()
+                try:
+                    self.on_change(batch)
+                except Exception:
+                    pass
+
+    def _read_events(self, fd, changed):
+        try:
+            data = os.read(fd, 65536)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset + self.EVENT.size <= len(data):
+            wd, mask, _, length = self.EVENT.unpack_from(data, offset)
+            name = data[offset + self.EVENT.size:offset + self.EVENT.size + length].rstrip(b"\0")
+            offset += self.EVENT.size + length
+
+            if mask & self.IN_Q_OVERFLOW:
+                # Olay kuyruğu taştı, tüm ağaçları değişmiş say
+                changed.update(self.roots)
+                continue
+            path = self.watches.get(wd)
+            if path is None:
+                continue
+            if mask & self.IN_IGNORED:
+                del self.watches[wd]
+                continue
+            changed.add(path)
+            if mask & self.IN_ISDIR and mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                # Yeni gelen dizin ve içindekiler de izlenmeli
+                new_dir = os.path.join(path, os.fsdecode(name))
+                self._watch_tree(new_dir)
+                changed.add(new_dir)
+
+
+def _first_tag(tags, *keys):
+    """Etiketteki ilk değeri döndürür (easy etiketler listedir, ID3 çerçevelerinde .text vardır)"""
+    for key in keys:
+        try:
+            value = tags[key]
+        except (KeyError, ValueError, TypeError):
+            continue
+        value = getattr(value, 'text', value)
+        if isinstance(value, (list, tuple)):
+            value = value[0] if value else None
+        if value:
+            return str(value)
+    return None
+
+
+def read_metadata(path):
+    """Dosyanın (sanatçı, başlık, albüm, süre, bit hızı, örnekleme hızı) bilgisini okur
+
+    Okunamayan alanlar None olur.
+    """
+    from mutagen import File as MutagenFile
+
+    artist = title = album = length = bitrate = sample_rate = None
+    try:
+        audio = MutagenFile(path, easy=True)
+    except Exception:
+        audio = None
+    if audio is not None:
+        tags = getattr(audio, 'tags', None)
+        if tags:
+            artist = _first_tag(tags, 'artist', 'TPE1')
+            title = _first_tag(tags, 'title', 'TIT2')
+            album = _first_tag(tags, 'album', 'TALB')
+        info = getattr(audio, 'info', None)
+        if info is not None:
+            length = getattr(info, 'length', None)
+            bitrate = getattr(info, 'bitrate', None)
+            sample_rate = getattr(info, 'sample_rate', None)
+    return artist, title, album, length, bitrate, sample_rate
+
+
+def read_tags_batch(items):
+    """(id, yol, mtime, boyut) listesinin etiketlerini okur (işlem havuzunda çalışır)
+
+    (satırlar, dosya başına okuma süreleri) döndürür.
+    """
+    rows = []
+    durations = []
+    for track_id, path, mtime, size in items:
+        started = time.perf_counter()
+        # Okunamayan dosyalar da yazılır, böylece değişmedikçe tekrar denenmez
+        rows.append((track_id, mtime, size) + read_metadata(path))
+        durations.append(time.perf_counter() - started)
+    return rows, durations
+
+
+class MetadataCache:
+    """Son kullanılan dosyaların bilgilerini bellekte tutar (LRU), mtime ve boyut değişince yeniden okur"""
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max(1, max_entries)
+        # yol -> ((mtime, boyut), read_metadata sonucu); sıra en eskiden en yeniye
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def load(self, path):
+        """Bilgiyi önbellekten döndürür, yoksa dosyadan okuyup saklar (dosya yoksa OSError)"""
+        st = os.stat(path)
+        key = (st.st_mtime_ns, st.st_size)
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is not None and entry[0] == key:
+                self.entries.move_to_end(path)
+                metrics.count("metadata.hit")
+                return entry[1]
+        metrics.count("metadata.miss")
+        metadata = read_metadata(path)
+        with self.lock:
+            self.entries[path] = (key, metadata)
+            self.entries.move_to_end(path)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return metadata
+
+    def peek(self, path):
+        """stat yapmadan, varsa saklanan bilgiyi döndürür (durum satırı gibi sık çağrılan yerler için)"""
+        with self.lock:
+            entry = self.entries.get(path)
+            return entry[1] if entry is not None else None
+
+
+class ReadAhead:
+    """Sıradaki şarkıları arka planda sayfa önbelleğine okur (yavaş veya ağ üzerindeki dizinler için)
+
+    posix_fadvise(WILLNEED) varsa çekirdekten okumayı başlatması istenir, yoksa dosya
+    parça parça okunur. Toplam okunan bayt bütçeyle sınırlıdır; sıra değişince süren
+    iş bırakılıp yeni sıraya geçilir.
+    """
+
+    CHUNK = 1 << 20   # fadvise yoksa tek seferde okunan bayt
+    WARMED = 64       # Yakın zamanda okunan (tekrar okunmayacak) dosya sayısı
+
+    def __init__(self, tracks=3, budget=256 << 20):
+        self.tracks = max(0, tracks)
+        self.budget = max(0, budget)
+        self.generation = 0
+        self._pending = None
+        self._worker = None
+        self._lock = threading.Lock()
+        # yol -> (mtime, boyut, okunan bayt)
+        self.warmed = OrderedDict()
+
+    def schedule(self, paths):
+        """Yeni sırayı bildirir; önceki sıranın okunması bırakılır"""
+        with self._lock:
+            self.generation += 1
+            if not self.tracks or not self.budget:
+                return
+            self._pending = (self.generation, list(paths)[:self.tracks])
+            if self._worker is not None:
+                return
+            self._worker = threading.Thread(target=self._run)
+            self._worker.daemon = True
+            self._worker.start()
+
+    def cancel(self):
+        with self._lock:
+            self.generation += 1
+            self._pending = None
+
+    def _run(self):
+        while True:
+            with self._lock:
+                job, self._pending = self._pending, None
+                if job is None:
+                    self._worker = None
+                    return
+            generation, paths = job
+            remaining = self.budget
+            for path in paths:
+                if remaining <= 0 or generation != self.generation:
+                    break
+                remaining -= self._warm(path, remaining, generation)
+
+    def _warm(self, path, limit, generation):
+        """Dosyanın ilk limit baytını önbelleğe alır, bütçeden düşülecek bayt sayısını döndürür"""
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            return 0
+        try:
+            st = os.fstat(fd)
+            length = min(st.st_size, limit)
+            warmed = self.warmed.get(path)
+            if warmed is not None and warmed[:2] == (st.st_mtime_ns, st.st_size) and warmed[2] >= length:
+                return length
+
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(fd, 0, length, os.POSIX_FADV_WILLNEED)
+                done = length
+            else:
+                done = 0
+                while done < length and generation == self.generation:
+                    data = os.read(fd, min(self.CHUNK, length - done))
+                    if not data:
+                        break
+                    done += len(data)
+            metrics.count("readahead.bytes", done)
+
+            self.warmed[path] = (st.st_mtime_ns, st.st_size, done)
+            self.warmed.move_to_end(path)
+            while len(self.warmed) > self.WARMED:
+                self.warmed.popitem(last=False)
+            return done
+        except OSError:
+            return 0
+        finally:
+            os.close(fd)
+
+
+class WaveformCache:
+    """Şarkıların tepe özetlerini (PEAKS sütunluk en küçük/en büyük değerler) hesaplar ve saklar
+
+    Özet arka planda tek thread'de NumPy ile hesaplanır: WAV dosyaları doğrudan okunur,
+    diğer biçimler mpv ile ham PCM'e çözülüp borudan okunur. Sonuç yol, değiştirilme zamanı
+    ve boyuttan türetilen adla küçük bir ikili dosyaya yazılır; bir şarkının özeti bir kez
+    hesaplanır. Durum satırı için çizilmiş çubuk da saklanır, her karede yalnızca dilimlenir.
+    """
+
+    PEAKS = 400
+    RATE = 8000         # mpv'nin çözdüğü PCM'in örnekleme hızı
+    BLOCK = 256         # İlk indirgemede bir tepe değerinin kapsadığı örnek sayısı
+    CHUNK = 1 << 16     # Tek seferde okunan örnek sayısı
+    MAGIC = b"TWF1"
+    LEVELS = "▁▂▃▄▅▆▇█"
+
+    def __init__(self, mpv_path="mpv", directory=None, max_entries=64):
+        self.mpv_path = mpv_path
+        self.directory = directory or os.path.join(cache_dir(), "waveforms")
+        self.max_entries = max(1, max_entries)
+        # yol -> ((mtime, boyut), özet, {genişlik: çubuk}); özet None ise hesaplanamadı
+        self.entries = OrderedDict()
+        # Hesaplanmakta olan yollar (aynı şarkı iki kez sıraya girmez)
+        self.pending = set()
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(1, "termus-waveform")
+        self.process = None
+        self.closed = False
+        # Özet hazır olunca yol ile çağrılır (hesaplama thread'inde)
+        self.on_ready = None
+
+    def request(self, path):
+        """Özet bellekte yoksa arka planda diskten yükler veya hesaplar"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        key = (st.st_mtime_ns, st.st_size)
+        with self.lock:
+            entry = self.entries.get(path)
+            if (entry is not None and entry[0] == key) or path in self.pending or self.closed:
+                return
+            self.pending.add(path)
+        self.executor.submit(self._load, path, key)
+
+    def bar(self, path, width):
+        """Şarkının width karakterlik dalga formu çubuğunu döndürür (özet hazır değilse None)"""
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is None or entry[1] is None:
+                return None
+            bars = entry[2]
+            if width not in bars:
+                bars[width] = self.render(entry[1], width)
+            return bars[width]
+
+    def close(self):
+        """Bekleyen hesaplamaları iptal eder, süren mpv çözümlemesini durdurur"""
+        self.closed = True
+        # Sıradaki işler closed görüp hesaplamadan biter
+        self.executor.shutdown(wait=False)
+        process = self.process
+        if process is not None:
+            process.kill()
+
+    def _cache_path(self, path, key):
+        name = hashlib.blake2b(f"{path}\0{key[0]}\0{key[1]}".encode("utf-8", "surrogateescape"),
+                               digest_size=16).hexdigest()
+        return os.path.join(self.directory, name + ".peaks")
+
+    def _load(self, path, key):
+        cache_path = self._cache_path(path, key)
+        summary = None
+        try:
+            with open(cache_path, "rb") as f:
+                data = f.read()
+            if data.startswith(self.MAGIC):
+                summary = data[len(self.MAGIC):]
+                metrics.count("waveform.hit")
+        except OSError:
+            pass
+        if summary is None and not self.closed:
+            started = time.perf_counter()
+            try:
+                summary = self.compute(path)
+            except Exception:
+                summary = None
+            metrics.record("waveform", time.perf_counter() - started)
+            if self.closed:
+                # Yarıda kalan çözümleme saklanmaz
+                summary = None
+            elif summary is not None:
+                self._store(cache_path, summary)
+        with self.lock:
+            self.pending.discard(path)
+            self.entries[path] = (key, summary, {})
+            self.entries.move_to_end(path)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        if summary is not None and self.on_ready and not self.closed:
+            self.on_ready(path)
+
+    def _store(self, cache_path, summary):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(prefix=".termus-", dir=self.directory)
+            with open(fd, "wb") as f:
+                f.write(self.MAGIC + summary)
+            os.replace(temp_path, cache_path)
+        except OSError:
+            pass
+
+    def compute(self, path):
+        """Dosyanın tepe özetini (PEAKS adet int8 en küçük/en büyük çifti) döndürür, çözülemezse None"""
+        import numpy
+
+        mins, maxs = [], []
+        carry = numpy.zeros(0, numpy.float32)
+        for samples in self._samples(path):
+            samples = numpy.concatenate((carry, samples))
+            whole = len(samples) - len(samples) % self.BLOCK
+            blocks = samples[:whole].reshape(-1, self.BLOCK)
+            mins.append(blocks.min(axis=1))
+            maxs.append(blocks.max(axis=1))
+            carry = samples[whole:]
+        if len(carry):
+            mins.append(carry.min(keepdims=True))
+            maxs.append(carry.max(keepdims=True))
+        if not mins:
+            return None
+        mins, maxs = numpy.concatenate(mins), numpy.concatenate(maxs)
+        edges = numpy.linspace(0, len(mins), self.PEAKS + 1).astype(numpy.intp)[:-1]
+        peaks = numpy.stack((numpy.minimum.reduceat(mins, edges), numpy.maximum.reduceat(maxs, edges)), axis=1)
+        return numpy.clip(numpy.round(peaks * 127), -127, 127).astype(numpy.int8).tobytes()
+
+    def _samples(self, path):
+        """Dosyanın örneklerini [-1, 1] aralığında float32 dizileri olarak parça parça üretir"""
+        import numpy
+        import wave
+
+        if path.lower().endswith(".wav"):
+            try:
+                reader = wave.open(path)
+            except (OSError, EOFError, wave.Error):
+                reader = None
+            if reader is not None:
+                with reader:
+                    width = reader.getsampwidth()
+                    frames = self.CHUNK // reader.getnchannels()
+                    while not self.closed:
+                        data = reader.readframes(frames)
+                        if not data:
+                            return
+                        if width == 1:
+                            yield (numpy.frombuffer(data, numpy.uint8).astype(numpy.float32) - 128) / 128
+                        elif width == 3:
+                            # 24 bit: üst iki bayt yeterince hassas
+                            raw = numpy.frombuffer(data, numpy.uint8).reshape(-1, 3)[:, 1:]
+                            yield numpy.ascontiguousarray(raw).view("<i2").ravel().astype(numpy.float32) / 32768
+                        else:
+                            dtype = "<i2" if width == 2 else "<i4"
+                            scale = float(1 << (8 * width - 1))
+                            yield numpy.frombuffer(data, dtype).astype(numpy.float32) / scale
+                return
+
+        # Diğer biçimler: mpv tek kanallı 16 bit PCM'i stdout'a yazar
+        command = [self.mpv_path, "--no-config", "--no-terminal", "--vo=null", "--vid=no",
+                   "--ao=pcm", "--ao-pcm-file=/dev/stdout", "--ao-pcm-waveheader=no",
+                   "--audio-format=s16", "--audio-channels=mono",
+                   f"--audio-samplerate={self.RATE}", "--", path]
+        metrics.count("spawn.waveform_decoder")
+        with subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                              stderr=subprocess.DEVNULL) as process:
+            self.process = process
+            try:
+                while not self.closed:
+                    data = process.stdout.read(self.CHUNK * 2)
+                    if len(data) < 2:
+                        break
+                    yield numpy.frombuffer(data[:len(data) & ~1], "<i2").astype(numpy.float32) / 32768
+            finally:
+                self.process = None
+                process.kill()
+
+    @classmethod
+    def render(cls, summary, width):
+        """Özeti width karakterlik blok çubuğuna çevirir (yükseklik şarkının en yüksek tepesine göre)"""
+        import numpy
+
+        peaks = numpy.frombuffer(summary, numpy.int8).reshape(-1, 2).astype(numpy.float32)
+        amplitude = peaks[:, 1] - peaks[:, 0]
+        edges = numpy.linspace(0, len(amplitude), width + 1).astype(numpy.intp)[:-1]
+        columns = numpy.maximum.reduceat(amplitude, edges)
+        top = columns.max()
+        if top <= 0:
+            return cls.LEVELS[0] * width
+        levels = numpy.minimum((columns / top * len(cls.LEVELS)).astype(numpy.intp), len(cls.LEVELS) - 1)
+        return "".join(cls.LEVELS[level] for level in levels)
+
+
+class TagScanner:
+    """Kütüphanedeki etiketleri arka planda işlem havuzuyla okur, indekse toplu yazar"""
+
+    BATCH_SIZE = 64      # Bir işçiye tek seferde verilen dosya sayısı
+    WRITE_SIZE = 1024    # Veritabanına tek işlemde yazılan satır sayısı
+
+    def __init__(self, library, workers=None):
+        self.library = library
+        self.workers = workers or os.cpu_count() or 1
+        self.thread = None
+        self.cancel_event = threading.Event()
+        # Tarama sürerken yeni dosyalar eklenirse bittiğinde yeniden bakılır
+        self.rerun = False
+        self.total = 0
+        self.done = 0
+        self.started_at = 0.0
+        self.elapsed = 0.0
+        # Tarama bitince (okunan dosya sayısı, iptal edildi mi) ile çağrılır
+        self.on_finish = None
+
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self):
+        """Taramayı başlatır, zaten çalışıyorsa bitince yeniden taranmasını ister ve False döndürür"""
+        if self.is_running():
+            self.rerun = True
+            return False
+        self.cancel_event.clear()
+        self.total = self.done = 0
+        self.started_at = time.monotonic()
+        self.thread = threading.Thread(target=self._run)
+        self.thread.daemon = True
+        self.thread.start()
+        return True
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def _run(self):
+        while True:
+            self.rerun = False
+            pending = self.library.pending_tags()
+            self.total += len(pending)
+            if pending:
+                self._read_all(pending)
+            if not self.rerun or self.cancel_event.is_set():
+                break
+        self.elapsed = time.monotonic() - self.started_at
+        if self.on_finish:
+            self.on_finish(self.done, self.cancel_event.is_set())
+
+    def _read_all(self, pending):
+        # İşlem havuzu modülleri ağır, açılışta değil ilk taramada yüklenir
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+        batches = [pending[i:i + self.BATCH_SIZE] for i in range(0, len(pending), self.BATCH_SIZE)]
+        batches.reverse()
+        buffer = []
+        # spawn: çok thread'li bir süreçten fork etmek güvenli değil
+        context = multiprocessing.get_context("spawn")
+        metrics.count("spawn.tag_worker", min(self.workers, len(batches)))
+        with ProcessPoolExecutor(self.workers, mp_context=context) as pool:
+            running = set()
+            while batches or running:
+                # İptalde yalnızca yoldaki partiler beklenir
+                while batches and len(running) < self.workers * 2 and not self.cancel_event.is_set():
+                    running.add(pool.submit(read_tags_batch, batches.pop()))
+                if not running:
+                    break
+                finished, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    try:
+                        rows, durations = future.result()
+                    except Exception:
+                        continue
+                    for duration in durations:
+                        metrics.record("tag_read", duration)
+                    buffer.extend(rows)
+                    self.done += len(rows)
+                if len(buffer) >= self.WRITE_SIZE:
+                    self.library.store_tags(buffer)
+                    buffer = []
+        if buffer:
+            self.library.store_tags(buffer)
+
+
+# Kopya aramada dosyanın başından ve sonundan okunan parça boyu
+HASH_CHUNK = 64 << 10
+
+
+def hash_file(path, size, full=False):
+    """Dosyanın baş ve son parçalarının (full=True ise tamamının) özetini döndürür (okunamazsa None)
+
+    HASH_CHUNK'ın iki katından küçük dosyalarda baş-son özeti tam özetle aynıdır.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    try:
+        with open(path, "rb") as f:
+            if full or size <= 2 * HASH_CHUNK:
+                for block in iter(functools.partial(f.read, 1 << 20), b""):
+                    digest.update(block)
+            else:
+                digest.update(f.read(HASH_CHUNK))
+                f.seek(-HASH_CHUNK, os.SEEK_END)
+                digest.update(f.read(HASH_CHUNK))
+    except OSError:
+        return None
+    return digest.digest()
+
+
+class DuplicateFinder:
+    """Aynı dosyaları aşamalı olarak bulur: boyut ve süre, baş-son özeti, gerekirse tam özet
+
+    Her aşama yalnızca bir önceki aşamada eşi kalan dosyalara bakar. Özetler thread
+    havuzunda paralel hesaplanır (dosya okuma ve hashlib GIL'i bırakır) ve dosyanın
+    değiştirilme zamanı ve boyutuyla indekste saklanır; değişmemiş dosyalar yeniden okunmaz.
+    """
+
+    # duplicate_candidates satırındaki sütunlar
+    PARTIAL, FULL = 5, 6
+
+    def __init__(self, library, workers=None):
+        self.library = library
+        self.workers = workers or min(32, (os.cpu_count() or 1) * 2)
+        # Son aramada diskten okunan dosya sayısı
+        self.hashed = 0
+
+    @staticmethod
+    def _regroup(groups, key):
+        """Grupları key'e göre böler, eşi kalmayan dosyaları (ve key'i None olanları) atar"""
+        result = []
+        for group in groups:
+            split = {}
+            for row in group:
+                value = key(row)
+                if value is not None:
+                    split.setdefault(value, []).append(row)
+            result.extend(rows for rows in split.values() if len(rows) > 1)
+        return result
+
+    def _hash_stage(self, pool, groups, column, changed):
+        """Gruplardaki özeti eksik dosyaları paralel özetler, grupları özete göre böler"""
+        full = column == self.FULL
+        missing = [row for group in groups for row in group if row[column] is None]
+        digests = pool.map(lambda row: hash_file(row[1], row[3], full), missing)
+        for row, digest in zip(missing, digests):
+            row[column] = digest
+            if not full and row[3] <= 2 * HASH_CHUNK:
+                row[self.FULL] = digest
+            if digest is not None:
+                changed[row[0]] = row
+        self.hashed += len(missing)
+        return self._regroup(groups, lambda row: row[column])
+
+    def find(self, roots):
+        """roots altındaki kopyaları [(boyut, [yol, ...]), ...] olarak döndürür (yollar sıralı)"""
+        self.hashed = 0
+        by_size = {}
+        for row in self.library.duplicate_candidates(roots):
+            by_size.setdefault(row[3], []).append(list(row))
+        groups = [group for group in by_size.values() if len(group) > 1]
+        # Süre bilinen dosyalarda süre de eşleşmeli (etiketi okunmamış dosya varsa bölünmez)
+        groups = [group for group in groups if any(row[4] is None for row in group)] + \
+            self._regroup([group for group in groups if all(row[4] is not None for row in group)],
+                          lambda row: round(row[4]))
+
+        changed = {}
+        with ThreadPoolExecutor(self.workers, "termus-hash") as pool:
+            groups = self._hash_stage(pool, groups, self.PARTIAL, changed)
+            groups = self._hash_stage(pool, groups, self.FULL, changed)
+        if changed:
+            self.library.store_hashes([(row[0], row[2], row[3], row[self.PARTIAL], row[self.FULL])
+                                       for row in changed.values()])
+        groups = [(group[0][3], sorted(row[1] for row in group)) for group in groups]
+        return sorted(groups, key=lambda item: item[1][0])
+
+
+class PlayHistory:
+    """Çalma geçmişini (çalma, atlama, bitirme olayları) yalnızca eklenen bir SQLite günlüğünde tutar
+
+    Olaylar bellekte biriktirilir ve BATCH olayda ya da ilk olaydan INTERVAL saniye sonra
+    (olay döngüsündeki zamanlayıcıyla) tek işlemle arka plan thread'inde yazılır; çalma
+    yolu diske hiç beklemez. Sorgular da aynı thread'de, bekleyen yazmalardan sonra
+    çalışır. Aynı işlemde şarkı başına toplamlar da güncellenir, böylece en çok
+    çalınanlar günlüğü baştan okumadan bulunur.
+    """
+
+    BATCH = 32
+    INTERVAL = 30.0
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS events (
+            id INTEGER PRIMARY KEY,
+            time REAL NOT NULL,
+            path TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            position REAL
+        );
+        CREATE TABLE IF NOT EXISTS totals (
+            path TEXT PRIMARY KEY,
+            plays INTEGER NOT NULL DEFAULT 0,
+            skips INTEGER NOT NULL DEFAULT 0,
+            completes INTEGER NOT NULL DEFAULT 0,
+            last_played REAL
+        );
+        CREATE INDEX IF NOT EXISTS totals_plays ON totals(plays, last_played);
+    """
+
+    def __init__(self, db_path=None, loop=None):
+        self.db_path = db_path or os.path.join(cache_dir(), "history.db")
+        self.loop = loop
+        self.lock = threading.Lock()
+        try:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            self.db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self.db.execute("PRAGMA journal_mode=WAL")
+        except (OSError, sqlite3.Error):
+            # Önbellek dizini yazılamıyorsa geçmiş yalnızca bu oturum için tutulur
+            self.db = sqlite3.connect(":memory:", check_same_thread=False)
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(self.SCHEMA)
+        # (zaman, yol, tür, konum) olayları; yazılmayı bekler
+        self.buffer = []
+        # Biriken olayları INTERVAL sonra yazdıracak zamanlayıcı
+        self.timer = None
+        self.executor = ThreadPoolExecutor(1, "termus-history")
+
+    def record(self, kind, path, position=None):
+        """Olayı biriktirir ("play", "skip", "complete"); BATCH olayda ya da INTERVAL sonra yazdırır"""
+        self.buffer.append((time.time(), path, kind, position))
+        if len(self.buffer) >= self.BATCH:
+            self.flush()
+        elif self.timer is None and self.loop is not None:
+            self.timer = self.loop.call_later(self.INTERVAL, self.flush)
+
+    def _write(self, events):
+        """Olayları ve toplamları tek işlemde yazar"""
+        with self.lock, self.db:
+            self.db.executemany("INSERT INTO events (time, path, kind, position) VALUES (?, ?, ?, ?)", events)
+            for when, path, kind, _ in events:
+                self.db.execute("INSERT OR IGNORE INTO totals (path) VALUES (?)", (path,))
+                if kind == "play":
+                    self.db.execute("UPDATE totals SET plays = plays + 1, last_played = ? WHERE path = ?",
+                                    (when, path))
+                else:
+                    column = "skips" if kind == "skip" else "completes"
+                    self.db.execute(f"UPDATE totals SET {column} = {column} + 1 WHERE path = ?", (path,))
+
+    def flush(self):
+        """Biriken olayları arka planda yazdırır, yazma işinin future'ını döndürür"""
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        events, self.buffer = self.buffer, []
+        return self.executor.submit(self._write, events)
+
+    def query(self, func, *args):
+        """Biriken olayları yazdırıp sorguyu geçmiş thread'inde çalıştırır, future döndürür"""
+        self.flush()
+        return self.executor.submit(func, *args)
+
+    def close(self):
+        try:
+            self.flush().result()
+        except sqlite3.Error:
+            pass
+        self.executor.shutdown()
+
+    def top(self, limit=10):
+        """En çok çalınan şarkılar: [(yol, çalma, atlama, bitirme), ...] (geçmiş thread'inde çağrılır)"""
+        with self.lock:
+            return self.db.execute(
+                "SELECT path, plays, skips, completes FROM totals WHERE plays > 0 "
+                "ORDER BY plays DESC, last_played DESC LIMIT ?", (limit,)).fetchall()
+
+    def recent(self, limit=10):
+        """Son çalınan şarkılar, yeniden eskiye: [(zaman, yol), ...] (geçmiş thread'inde çağrılır)"""
+        with self.lock:
+            return self.db.execute(
+                "SELECT time, path FROM events WHERE kind = 'play' ORDER BY id DESC LIMIT ?",
+                (limit,)).fetchall()
+
+
+class TrackTable:
+    """Çalma listesinin sıkıştırılmış hali.
+
+    Dizin yolları bir kez tutulur, dosya adları tek bir UTF-8 bloğunda dizin dizin
+    sıralı durur. Şarkılar tamsayı kimliklerle, yola göre sıralı liste ise dizi
+    tabanlı vektörlerle temsil edilir. Liste gibi davranır: len(), [sıra] ile yol, for ile
+    yollar, index(yol).
+    """
+
+    def __init__(self, paths=()):
+        self.dirs = []               # dizin no -> dizin yolu
+        self.dir_ids = {}            # dizin yolu -> dizin no
+        self.dir_start = array('I')  # dizin no -> ilk şarkı no (dizinin şarkıları ardışık)
+        self.track_dir = array('I')  # şarkı no -> dizin no
+        self.name_offsets = array('Q', [0])   # şarkı no -> blok içindeki ad başlangıcı
+        self.names = b""             # dizin dizin ada göre sıralı dosya adları
+        self.extra_paths = []        # sonradan eklenen şarkılar (no >= base_count)
+        self.extra_ids = {}
+        self.removed = set()
+        self.order = array('I')      # sıra -> şarkı no
+        self.pos = array('i')        # şarkı no -> sıra (-1: listede değil)
+        self._build(paths)
+
+    def _build(self, paths):
+        """Yola göre sıralı yollardan tabloyu kurar"""
+        # Sıralı girişte bir dizinin dosyaları ada göre sıralı gelir
+        dir_names = []
+        entry_dir = array('I')
+        entry_slot = array('I')
+        for path in paths:
+            directory, _, name = path.rpartition(os.sep)
+            dir_id = self.dir_ids.get(directory)
+            if dir_id is None:
+                dir_id = len(self.dirs)
+                self.dirs.append(directory)
+                self.dir_ids[directory] = dir_id
+                dir_names.append([])
+            entry_dir.append(dir_id)
+            entry_slot.append(len(dir_names[dir_id]))
+            dir_names[dir_id].append(name.encode("utf-8", "surrogateescape"))
+
+        blob = []
+        offset = 0
+        for dir_id, names in enumerate(dir_names):
+            self.dir_start.append(len(self.track_dir))
+            for name in names:
+                offset += len(name)
+                self.name_offsets.append(offset)
+                self.track_dir.append(dir_id)
+            blob.extend(names)
+        self.dir_start.append(len(self.track_dir))
+        self.names = b"".join(blob)
+        self.base_count = len(self.track_dir)
+
+        dir_start = self.dir_start
+        self.order = array('I', [dir_start[d] + slot for d, slot in zip(entry_dir, entry_slot)])
+        self._reindex()
+
+    def _reindex(self):
+        pos = array('i', [-1]) * (self.base_count + len(self.extra_paths))
+        for position, track in enumerate(self.order):
+            pos[track] = position
+        self.pos = pos
+
+    def __len__(self):
+        return len(self.order)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self.path(track) for track in self.order[position]]
+        return self.path(self.order[position])
+
+    def __iter__(self):
+        path = self.path
+        for track in self.order:
+            yield path(track)
+
+    def __contains__(self, path):
+        return self.find(path) is not None
+
+    def file_names(self, start=0, end=None):
+        """[start, end) sıralarındaki dosya adları (tam yol oluşturmadan)"""
+        base_count = self.base_count
+        offsets = self.name_offsets
+        names = self.names
+        for track in self.order[start:end]:
+            if track >= base_count:
+                yield os.path.basename(self.extra_paths[track - base_count])
+            else:
+                yield names[offsets[track]:offsets[track + 1]].decode("utf-8", "surrogateescape")
+
+    def name_bytes(self, track):
+        return self.names[self.name_offsets[track]:self.name_offsets[track + 1]]
+
+    def path(self, track):
+        """Şarkı numarasından tam yolu oluşturur"""
+        if track >= self.base_count:
+            return self.extra_paths[track - self.base_count]
+        name = self.names[self.name_offsets[track]:self.name_offsets[track + 1]]
+        return self.dirs[self.track_dir[track]] + os.sep + name.decode("utf-8", "surrogateescape")
+
+    def track_id(self, path):
+        """Yolun şarkı numarasını döndürür (yoksa None)"""
+        track = self.extra_ids.get(path)
+        if track is None:
+            directory, _, name = path.rpartition(os.sep)
+            dir_id = self.dir_ids.get(directory)
+            if dir_id is None:
+                return None
+            # Dizinin şarkıları ada göre sıralı: ikili arama
+            key = name.encode("utf-8", "surrogateescape")
+            low, high = self.dir_start[dir_id], self.dir_start[dir_id + 1]
+            while low < high:
+                middle = (low + high) // 2
+                if self.name_bytes(middle) < key:
+                    low = middle + 1
+                else:
+                    high = middle
+            if low == self.dir_start[dir_id + 1] or self.name_bytes(low) != key:
+                return None
+            track = low
+        return None if track in self.removed else track
+
+    def find(self, path):
+        """Yolun listedeki sırasını döndürür (yoksa None)"""
+        track = self.track_id(path)
+        if track is None:
+            return None
+        return self.position(track)
+
+    def position(self, track):
+        """Şarkının listedeki sırası, konum vektöründen O(1)"""
+        position = self.pos[track]
+        return position if position >= 0 else None
+
+    def index(self, path):
+        position = self.find(path)
+        if position is None:
+            raise ValueError(f"{path} listede yok")
+        return position
+
+    def id_count(self):
+        """Verilmiş şarkı numaralarının üst sınırı (silinenler dahil)"""
+        return self.base_count + len(self.extra_paths)
+
+    def update(self, added, removed):
+        """Eklenen ve silinen yolları uygular, yeni yollar sıralı yerlerine yerleşir"""
+        if removed:
+            gone = set()
+            for path in removed:
+                track = self.track_id(path)
+                if track is not None:
+                    gone.add(track)
+            self.removed |= gone
+            self.order = array('I', [track for track in self.order if track not in gone])
+        for path in added:
+            if self.track_id(path) is not None:
+                continue
+            track = self.extra_ids.get(path)
+            if track is None:
+                track = self.base_count + len(self.extra_paths)
+                self.extra_paths.append(path)
+                self.extra_ids[path] = track
+            self.removed.discard(track)
+            self.order.insert(self._bisect(path), track)
+        self._reindex()
+
+    def _bisect(self, path):
+        low, high = 0, len(self.order)
+        while low < high:
+            middle = (low + high) // 2
+            if self.path(self.order[middle]) < path:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+
+class ShuffleOrder:
+    """Çalma listesini kopyalamadan karıştırır.
+
+    Şarkı numaraları üzerinde rastgele anahtarlı bir Feistel permütasyonu parça parça
+    üretilir; bir tur bitmeden hiçbir şarkı tekrar etmez. Geri gitmek için çalınan
+    şarkıların sınırlı bir geçmişi tutulur.
+    """
+
+    CHUNK = 256      # Tek seferde üretilen sıra uzunluğu
+    HISTORY = 1000   # Geri gidilebilecek şarkı sayısı
+    ROUNDS = 4
+
+    def __init__(self, size, start=None):
+        self.size = size
+        self.history = deque(maxlen=self.HISTORY)
+        self.forward = []    # geri gidildikten sonra ileri için
+        self.buffer = deque()
+        self._new_cycle(start)
+
+    def _new_cycle(self, start):
+        """Yeni anahtarlarla yeni bir tur başlatır (start bu turda çalınmaz)"""
+        self.start = start
+        self.half_bits = max(1, ((self.size - 1).bit_length() + 1) // 2)
+        self.mask = (1 << self.half_bits) - 1
+        self.domain = 1 << (2 * self.half_bits)
+        self.keys = [random.getrandbits(32) for _ in range(self.ROUNDS)]
+        self.counter = 0
+
+    def to_state(self, history=100):
+        """Sırayı oturum dosyasına yazılabilecek sözlük olarak döndürür (geçmişin sonuyla)"""
+        return {
+            "size": self.size,
+            "start": self.start,
+            "keys": self.keys,
+            "counter": self.counter,
+            "buffer": list(self.buffer),
+            "history": list(self.history)[-history:],
+            "forward": self.forward[-history:],
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """to_state ile kaydedilmiş sırayı geri yükler (bozuksa ValueError/TypeError/KeyError)"""
+        size = int(state["size"])
+        if size < 0:
+            raise ValueError("geçersiz şarkı sayısı")
+
+        def track_ids(values):
+            tracks = [int(track) for track in values]
+            if any(not 0 <= track < size for track in tracks):
+                raise ValueError("geçersiz şarkı numarası")
+            return tracks
+
+        order = cls(size)
+        keys = [int(key) for key in state["keys"]]
+        if len(keys) != cls.ROUNDS:
+            raise ValueError("geçersiz karıştırma anahtarları")
+        order.keys = keys
+        order.start = None if state["start"] is None else track_ids([state["start"]])[0]
+        order.counter = int(state["counter"])
+        if not 0 <= order.counter <= order.domain:
+            raise ValueError("geçersiz sayaç")
+        order.buffer.extend(track_ids(state["buffer"]))
+        order.history.extend(track_ids(state["history"]))
+        order.forward = track_ids(state["forward"])
+        return order
+
+    def resize(self, size, current):
+        """Şarkı numarası sayısı değişince (yeni dosyalar) yeni bir tur başlatır; geçmiş korunur"""
+        self.size = size
+        self.buffer.clear()
+        self._new_cycle(current)
+
+    def _permute(self, value):
+        """[0, domain) üzerinde birebir eşleme"""
+        left, right = value >> self.half_bits, value & self.mask
+        for key in self.keys:
+            left, right = right, left ^ ((((right ^ key) * 0x9E3779B1) >> 7) & self.mask)
+        return (left << self.half_bits) | right
+
+    def _fill(self):
+        # Tanım kümesi dışına düşen değerler atlanır (cycle walking)
+        while len(self.buffer) < self.CHUNK and self.counter < self.domain:
+            track = self._permute(self.counter)
+            self.counter += 1
+            if track < self.size and track != self.start:
+                self.buffer.append(track)
+
+    def peek(self, current, table, repeat):
+        """Sıradaki şarkı numarasını tüketmeden döndürür (tur bittiyse ve tekrar yoksa None)
+
+        Yeni tur çalan şarkı (current) ile başlamaz, böylece aynı şarkı art arda çalınmaz.
+        """
+        while self.forward:
+            if table.position(self.forward[-1]) is not None:
+                return self.forward[-1]
+            self.forward.pop()
+        while True:
+            if not self.buffer:
+                self._fill()
+            if not self.buffer:
+                if not repeat or not len(table):
+                    return None
+                self._new_cycle(None)
+                self._fill()
+                if len(self.buffer) > 1 and self.buffer[0] == current:
+                    self.buffer[0], self.buffer[1] = self.buffer[1], self.buffer[0]
+                continue
+            if table.position(self.buffer[0]) is not None:
+                return self.buffer[0]
+            # Listeden çıkarılmış şarkı
+            self.buffer.popleft()
+
+    def upcoming(self, table, count):
+        """Bu turda sırada olan en çok count şarkıyı tüketmeden döndürür"""
+        tracks = [track for track in reversed(self.forward) if table.position(track) is not None]
+        if len(tracks) < count:
+            self._fill()
+            for track in self.buffer:
+                if len(tracks) >= count:
+                    break
+                if table.position(track) is not None:
+                    tracks.append(track)
+        return tracks[:count]
+
+    def next(self, current, table, repeat=True):
+        """Sıradaki şarkıya geçer ve current'ı geçmişe ekler"""
+        track = self.peek(current, table, repeat)
+        if track is None:
+            return None
+        if self.forward:
+            self.forward.pop()
+        else:
+            self.buffer.popleft()
+        self.history.append(current)
+        return track
+
+    def back(self, current, table):
+        """Geçmişteki bir önceki şarkıya döner (yoksa None)"""
+        while self.history:
+            track = self.history.pop()
+            if table.position(track) is not None:
+                self.forward.append(current)
+                return track
+        return None
+
+
+TOKEN_RE = re.compile(r"\w+")
+QUERY_RE = re.compile(r'(?:(\w+):)?(?:"([^"]*)"|(\S+))')
+
+
+def normalize_text(text):
+    """Aramada kullanılmak üzere küçük harfe çevirir ve aksanları kaldırır"""
+    if text.isascii():
+        return text.lower()
+    text = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(c for c in text if not unicodedata.combining(c)).replace("ı", "i")
+
+
+def trigrams(word):
+    return {word[i:i + 3] for i in range(len(word) - 2)}
+
+
+class SearchIndex:
+    """Dosya adı ve etiketler üzerinde kelime/trigram ters indeksi ile sıralı, bulanık arama
+
+    Aynı belgelerden sanatçı ve albüm grupları da tutulur; ekleme ve silmede yalnızca
+    ilgili grup güncellenir. Etiketi olmayan dosyalarda albüm üst dizinin, sanatçı bir
+    üst dizinin adıdır.
+    """
+
+    FIELDS = ("name", "artist", "title", "album")
+    WEIGHTS = (1.0, 2.5, 3.0, 2.0)
+    FIELD_ALIASES = {
+        "name": 0, "file": 0, "dosya": 0,
+        "artist": 1, "sanatci": 1,
+        "title": 2, "baslik": 2,
+        "album": 3,
+    }
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self._pending = None
+        self._pending_lock = threading.Lock()
+        self._worker = None
+        self._reset()
+
+    def _reset(self):
+        self.doc_ids = {}        # yol -> belge no
+        self.doc_paths = []      # belge no -> yol (silinmişse None)
+        self.doc_fields = []     # belge no -> (sanatçı, başlık, albüm)
+        self.doc_tokens = []     # belge no -> ((alan, kelime no), ...)
+        self.token_ids = {}      # kelime -> kelime no
+        self.tokens = []         # kelime no -> kelime
+        self.postings = [{} for _ in self.FIELDS]   # alan -> kelime no -> [belge no] (yol sırasıyla)
+        self.unsorted = set()    # yol sırası bozulan (alan, kelime no) listeleri
+        self.token_grams = {}    # trigram -> {kelime no}
+        self.sorted_tokens = None
+        self.removed = 0
+        self.albums = {}         # (sanatçı, albüm) anahtarı -> [sanatçı adı, albüm adı, {belge no}]
+        self.album_keys = {}     # albüm anahtarı -> {(sanatçı, albüm) anahtarı}
+        self.artists = {}        # sanatçı anahtarı -> [sanatçı adı, {(sanatçı, albüm) anahtarı}, şarkı sayısı]
+        self.sorted_groups = None   # Gruplar eklenip silindikçe yeniden sıralanır
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    def sync(self, records):
+        """(yol, sanatçı, başlık, albüm) kayıtlarıyla indeksi eşitler, yalnızca farkları işler"""
+        with self.lock:
+            seen = set()
+            for path, artist, title, album in records:
+                seen.add(path)
+                fields = (artist, title, album)
+                doc = self.doc_ids.get(path)
+                if doc is not None:
+                    if self.doc_fields[doc] == fields:
+                        continue
+                    self._remove(path)
+                self._add(path, fields)
+            for path in [p for p in self.doc_ids if p not in seen]:
+                self._remove(path)
+
+            # Silinmiş belgeler çoğaldıysa indeksi yeniden kur
+            if self.removed > 1000 and self.removed > len(self.doc_ids) // 4:
+                live = [(p, *self.doc_fields[d]) for p, d in sorted(self.doc_ids.items())]
+                self._reset()
+                self.sync(live)
+
+    def sync_async(self, records):
+        """Eşitlemeyi arka planda yapar, arada gelen eski istekler atlanır"""
+        with self._pending_lock:
+            self._pending = records
+            if self._worker is not None:
+                return
+            self._worker = threading.Thread(target=self._sync_pending)
+            self._worker.daemon = True
+            self._worker.start()
+
+    def _sync_pending(self):
+        while True:
+            with self._pending_lock:
+                records, self._pending = self._pending, None
+                if records is None:
+                    self._worker = None
+                    return
+            self.sync(records)
+
+    def is_building(self):
+        """Arka planda eşitleme sürüyor mu"""
+        return self._worker is not None
+
+    def add(self, path, fields):
+        """Dosyayı indekse ekler (fields: sanatçı, başlık, albüm)"""
+        with self.lock:
+            self._remove(path)
+            self._add(path, tuple(fields))
+
+    def remove(self, path):
+        """Dosyayı indeksten çıkarır (kayıtlar sonraki yeniden kurulumda temizlenir)"""
+        with self.lock:
+            self._remove(path)
+
+    def _add(self, path, fields):
+        doc = len(self.doc_paths)
+        self.doc_ids[path] = doc
+        self.doc_paths.append(path)
+        self.doc_fields.append(fields)
+
+        name = os.path.splitext(os.path.basename(path))[0]
+        token_ids = self.token_ids
+        entries = []
+        for field, text in enumerate((name,) + fields):
+            if not text:
+                continue
+            postings = self.postings[field]
+            for word in set(TOKEN_RE.findall(normalize_text(text))):
+                token = token_ids.get(word)
+                if token is None:
+                    token = self._new_token(word)
+                docs = postings.get(token)
+                if docs is None:
+                    postings[token] = [doc]
+                else:
+                    last = self.doc_paths[docs[-1]]
+                    if last is None or last > path:
+                        self.unsorted.add((field, token))
+                    docs.append(doc)
+                entries.append((field, token))
+        self.doc_tokens.append(tuple(entries))
+        self._group_add(doc, path, fields)
+
+    def _remove(self, path):
+        doc = self.doc_ids.pop(path, None)
+        if doc is None:
+            return
+        self._group_remove(doc, path, self.doc_fields[doc])
+        self.doc_paths[doc] = None
+        self.doc_fields[doc] = None
+        self.doc_tokens[doc] = ()
+        self.removed += 1
+
+    @staticmethod
+    def _group_names(path, fields):
+        """Dosyanın (sanatçı, albüm) adları; etiket yoksa dizin adları"""
+        artist, _, album = fields
+        directory = os.path.dirname(path)
+        if not album:
+            album = os.path.basename(directory)
+        if not artist:
+            artist = os.path.basename(os.path.dirname(directory))
+        return artist, album
+
+    def _group_add(self, doc, path, fields):
+        artist, album = self._group_names(path, fields)
+        key = (normalize_text(artist), normalize_text(album))
+        group = self.albums.get(key)
+        if group is None:
+            group = self.albums[key] = [artist, album, set()]
+            self.album_keys.setdefault(key[1], set()).add(key)
+            entry = self.artists.get(key[0])
+            if entry is None:
+                entry = self.artists[key[0]] = [artist, set(), 0]
+            entry[1].add(key)
+            self.sorted_groups = None
+        group[2].add(doc)
+        self.artists[key[0]][2] += 1
+
+    def _group_remove(self, doc, path, fields):
+        artist, album = self._group_names(path, fields)
+        key = (normalize_text(artist), normalize_text(album))
+        group = self.albums.get(key)
+        if group is None:
+            return
+        group[2].discard(doc)
+        entry = self.artists[key[0]]
+        entry[2] -= 1
+        if not group[2]:
+            del self.albums[key]
+            self.album_keys[key[1]].discard(key)
+            if not self.album_keys[key[1]]:
+                del self.album_keys[key[1]]
+            entry[1].discard(key)
+            if not entry[1]:
+                del self.artists[key[0]]
+            self.sorted_groups = None
+
+    def _sorted_groups(self):
+        if self.sorted_groups is None:
+            self.sorted_groups = (sorted(self.artists), sorted(self.albums))
+        return self.sorted_groups
+
+    def artist_list(self):
+        """Sanatçıları ada göre sıralı (ad, albüm sayısı, şarkı sayısı) olarak döndürür"""
+        with self.lock:
+            artists = self.artists
+            return [(artists[key][0], len(artists[key][1]), artists[key][2])
+                    for key in self._sorted_groups()[0]]
+
+    def album_list(self, artist=None):
+        """Albümleri (sanatçı, albüm, şarkı sayısı) olarak döndürür; artist verilirse yalnızca onunkiler"""
+        with self.lock:
+            if artist is None:
+                keys = self._sorted_groups()[1]
+            else:
+                entry = self.artists.get(normalize_text(artist))
+                keys = sorted(entry[1]) if entry is not None else []
+            return [(self.albums[key][0], self.albums[key][1], len(self.albums[key][2])) for key in keys]
+
+    def find_albums(self, query):
+        """Adı sorguya uyan albümleri (sanatçı, albüm, yola göre sıralı yollar) olarak döndürür
+
+        Sorgu "sanatçı - albüm" biçiminde de verilebilir. Önce tam ad eşleşmesine, yoksa
+        albüm adlarında geçmesine bakılır; kütüphanenin tamamı gezilmez.
+        """
+        artist = None
+        name = normalize_text(query.strip())
+        if " - " in name:
+            artist, name = (part.strip() for part in name.split(" - ", 1))
+        with self.lock:
+            keys = self.album_keys.get(name)
+            if not keys:
+                keys = [key for album, keys in self.album_keys.items() if name in album for key in keys]
+            if artist is not None:
+                keys = [key for key in keys if key[0] == artist]
+            paths = self.doc_paths
+            return [(self.albums[key][0], self.albums[key][1], sorted(paths[doc] for doc in self.albums[key][2]))
+                    for key in sorted(keys)]
+
+    def _new_token(self, word):
+        token = len(self.tokens)
+        self.token_ids[word] = token
+        self.tokens.append(word)
+        for gram in trigrams(word):
+            self.token_grams.setdefault(gram, set()).add(token)
+        self.sorted_tokens = None
+        return token
+
+    def _match_tokens(self, word):
+        """Sorgu kelimesine uyan kelimeleri {kelime no: uyum} olarak döndürür"""
+        matches = {}
+        if len(word) == 1:
+            # Tek harf çok fazla kelimeye uyar, yalnızca tam eşleşmeye bak
+            token = self.token_ids.get(word)
+            return {token: 1.0} if token is not None else matches
+        if len(word) < 3:
+            # Kısa kelimeler için önek araması
+            if self.sorted_tokens is None:
+                self.sorted_tokens = sorted(self.token_ids.items())
+            start = bisect.bisect_left(self.sorted_tokens, (word,))
+            for token_text, token in self.sorted_tokens[start:]:
+                if not token_text.startswith(word):
+                    break
+                matches[token] = 1.0 if token_text == word else 0.8
+            return matches
+
+        grams = trigrams(word)
+        sets = sorted((self.token_grams.get(g, ()) for g in grams), key=len)
+        if sets[0]:
+            for token in set(sets[0]).intersection(*sets[1:]):
+                token_text = self.tokens[token]
+                if word in token_text:
+                    matches[token] = 1.0 if token_text == word else 0.8 if token_text.startswith(word) else 0.6
+        if matches:
+            return matches
+
+        # Tam eşleşme yok: trigram benzerliğiyle yazım hatalarını tolere et
+        counts = Counter()
+        for gram in grams:
+            counts.update(self.token_grams.get(gram, ()))
+        for token, common in counts.items():
+            similarity = 2.0 * common / (len(grams) + max(len(self.tokens[token]) - 2, 1))
+            if similarity >= 0.5:
+                matches[token] = 0.5 * similarity
+        return matches
+
+    def _term_scores(self, fields, matches):
+        """Tek bir sorgu kelimesi için {belge no: en iyi puan}"""
+        scores = {}
+        # Düşük puandan yükseğe yazılır, her belgede en iyisi kalır
+        for weight, field, token in sorted((self.WEIGHTS[field] * quality, field, token)
+                                           for token, quality in matches.items() for field in fields):
+            scores.update(dict.fromkeys(self.postings[field].get(token, ()), weight))
+        return scores
+
+    def _ranked_postings(self, fields, matches):
+        """Kelimenin listelerini puana göre azalan (puan, [belge listesi]) grupları olarak döndürür
+
+        Listeler yol sırasıyla tutulur; sırası bozulanlar burada sıralanır.
+        """
+        groups = {}
+        for token, quality in matches.items():
+            for field in fields:
+                docs = self.postings[field].get(token)
+                if not docs:
+                    continue
+                if (field, token) in self.unsorted:
+                    docs.sort(key=self._path_key)
+                    self.unsorted.discard((field, token))
+                groups.setdefault(self.WEIGHTS[field] * quality, []).append(docs)
+        return sorted(groups.items(), reverse=True)
+
+    def _path_key(self, doc):
+        return self.doc_paths[doc] or ""
+
+    def _top_scores(self, plans, limit):
+        """En iyi `limit` sonucu {belge no: puan} olarak döndürür (eşit puanlılar dahil)
+
+        En seçici kelimenin grupları puan sırasıyla gezilir; görülmemiş bir belgenin
+        alabileceği en yüksek puan k'ncı sonucun altına düşünce kalan gruplara bakılmaz.
+        Tek kelimede gruplar yol sırasıyla birleştirilir, ilk `limit` belge yeter.
+        """
+        groups = self._ranked_postings(plans[0][1], plans[0][2])
+        paths = self.doc_paths
+        scores = {}
+        if len(plans) == 1:
+            for weight, lists in groups:
+                docs = lists[0] if len(lists) == 1 else heapq.merge(*lists, key=self._path_key)
+                for doc in docs:
+                    if doc not in scores and paths[doc] is not None:
+                        scores[doc] = weight
+                        if len(scores) == limit:
+                            return scores
+            return scores
+
+        others = [self._ranked_postings(fields, matches) for _, fields, matches in plans[1:]]
+        if not all(others):
+            return {}
+        rest = sum(term[0][0] for term in others)
+        sets = {}       # (kelime sırası, puan) -> o gruptaki belgeler (ikinci kullanımda kurulur)
+        seen = set()
+        best = []       # en iyi `limit` puan, en düşüğü başta
+        for weight, lists in groups:
+            if len(best) == limit and best[0] > weight + rest:
+                break
+            candidates = set().union(*lists) - seen
+            seen |= candidates
+            partial = dict.fromkeys(candidates, weight)
+            # Diğer kelimelerin gruplarıyla kesiştir; her aday ilk (en iyi) grubunun puanını alır
+            for index, term in enumerate(others):
+                remaining = set(partial)
+                found = {}
+                for term_weight, term_lists in term:
+                    key = (index, term_weight)
+                    if key in sets:
+                        # Grup ikinci kez gerekti: listeleri kümeye çevir, adaylar üzerinden bak
+                        if sets[key] is None:
+                            sets[key] = set().union(*term_lists)
+                        hits = remaining & sets[key]
+                    else:
+                        sets[key] = None
+                        hits = set()
+                        for docs in term_lists:
+                            hits |= remaining.intersection(docs)
+                    for doc in hits:
+                        found[doc] = partial[doc] + term_weight
+                    remaining -= hits
+                    if not remaining:
+                        break
+                partial = found
+                if not partial:
+                    break
+            for doc, score in partial.items():
+                if paths[doc] is None:
+                    continue
+                scores[doc] = score
+                if len(best) < limit:
+                    heapq.heappush(best, score)
+                elif score > best[0]:
+                    heapq.heapreplace(best, score)
+
+        cutoff = best[0] if len(best) == limit else 0
+        return {doc: score for doc, score in scores.items() if score >= cutoff}
+
+    def _all_scores(self, plans):
+        """Bütün kelimelere uyan belgeleri {belge no: puan} olarak döndürür"""
+        scores = self._term_scores(plans[0][1], plans[0][2])
+        for cost, fields, matches in plans[1:]:
+            if cost < len(scores) * 8:
+                # Kelimenin kendi listesi kısa: iki sonucu kesiştir
+                term = self._term_scores(fields, matches)
+                scores = {doc: score + term[doc] for doc, score in scores.items() if doc in term}
+                continue
+            # Aday az: yalnızca adayların kelimelerine bak
+            narrowed = {}
+            for doc, score in scores.items():
+                best = 0
+                for field, token in self.doc_tokens[doc]:
+                    if field in fields and token in matches:
+                        best = max(best, self.WEIGHTS[field] * matches[token])
+                if best:
+                    narrowed[doc] = score + best
+            scores = narrowed
+        return scores
+
+    @classmethod
+    def parse_query(cls, query):
+        """Sorguyu (alan veya None, kelime) listesine çevirir: 'artist:foo bar'"""
+        terms = []
+        for field_name, quoted, word in QUERY_RE.findall(query):
+            text = quoted or word
+            field = None
+            if field_name:
+                field = cls.FIELD_ALIASES.get(normalize_text(field_name))
+                if field is None:
+                    text = f"{field_name} {text}"
+            for token in TOKEN_RE.findall(normalize_text(text)):
+                terms.append((field, token))
+        return terms
+
+    def search(self, query, limit=None):
+        """Sorguya uyan dosyaları en iyi eşleşme önce olacak şekilde döndürür
+
+        limit verilirse yalnızca en iyi `limit` sonuç aranır; geniş kelimelerde listelerin
+        tamamı gezilmez.
+        """
+        terms = self.parse_query(query)
+        if not terms or limit == 0:
+            return []
+
+        with self.lock:
+            plans = []
+            for field, word in terms:
+                fields = range(len(self.FIELDS)) if field is None else (field,)
+                matches = self._match_tokens(word)
+                if not matches:
+                    return []
+                cost = sum(len(self.postings[f].get(t, ())) for t in matches for f in fields)
+                plans.append((cost, fields, matches))
+
+            # En seçici kelimeyle başla, diğerlerini yalnızca adaylar üzerinde dene
+            plans.sort(key=lambda plan: plan[0])
+            if limit is not None:
+                scores = self._top_scores(plans, limit)
+            else:
+                scores = self._all_scores(plans)
+
+            paths = self.doc_paths
+            ranked = [(-score, paths[doc]) for doc, score in scores.items() if paths[doc] is not None]
+            if limit is not None:
+                ranked = heapq.nsmallest(limit, ranked)
+            else:
+                ranked.sort()
+            return [path for _, path in ranked]
+
+
+def page_window(page, count, size):
+    """Sayfayı geçerli aralığa sınırlar, (sayfa, sayfa sayısı, başlangıç, bitiş) döndürür"""
+    pages = max(1, (count + size - 1) // size)
+    page = min(max(page, 0), pages - 1)
+    return page, pages, page * size, min((page + 1) * size, count)
+
+
+def read_m3u(path):
+    """M3U/M3U8 dosyasındaki şarkı yollarını satır satır okuyarak sırayla üretir
+
+    Göreli yollar dosyanın dizinine göre çözülür; file:// dışındaki adresler atlanır.
+    """
+    base = os.path.dirname(os.path.abspath(path))
+    with open(path, encoding="utf-8-sig", errors="replace") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("file://"):
+                line = urllib.parse.unquote(line[7:])
+            elif "://" in line:
+                continue
+            yield os.path.normpath(os.path.join(base, os.path.expanduser(line)))
+
+
+def write_m3u(path, paths):
+    """Yolları M3U8 olarak yazar (önce geçici dosyaya), yazılan şarkı sayısını döndürür"""
+    fd, temp_path = tempfile.mkstemp(prefix=".termus-", suffix=".m3u8",
+                                     dir=os.path.dirname(os.path.abspath(path)))
+    count = 0
+    try:
+        with open(fd, "w", encoding="utf-8") as f:
+            f.write("#EXTM3U\n")
+            for track in paths:
+                f.write(track + "\n")
+                count += 1
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return count
+
+
+class Screen:
+    """Tüm konsol çıktısını olay döngüsünde tek katmandan yazar.
+
+    sys.stdout yerine geçer: print çağrıları tamponda birikir ve döngünün o turunun
+    sonunda tek seferde yazılır. Komut istemi beklerken gelen mesajlar istemin üstüne
+    yazılır, istem yeniden çizilir. Terminalde istemin hemen üstünde bir durum satırı
+    tutulur; satır en çok saniyede 1 / FRAME_INTERVAL kez ve yalnızca değişen
+    hücreleri yazılarak güncellenir.
+    """
+
+    FRAME_INTERVAL = 0.1
+    RESET = "\x1b[0m"
+
+    def __init__(self, stream, loop):
+        self.stream = stream
+        self.loop = loop
+        self.tty = stream.isatty()
+        self.lock = threading.Lock()
+        self.buffer = []
+        self.flush_scheduled = False
+        self.prompt = None        # Ekranda duran komut istemi (yoksa None)
+        self.status = None        # Çizilecek durum satırı: [(stil, karakter)]
+        self.drawn = None         # İstemin üstündeki durum satırında duran hücreler
+        self.frame = None
+        self.last_frame = 0.0
+        self.saved_stdout = None
+        self.loop_thread = threading.get_ident()
+
+    # --- Dosya arayüzü (print için) ---
+
+    @property
+    def encoding(self):
+        return self.stream.encoding
+
+    def isatty(self):
+        return self.tty
+
+    def fileno(self):
+        return self.stream.fileno()
+
+    def write(self, text):
+        with self.lock:
+            self.buffer.append(text)
+            if self.flush_scheduled:
+                return len(text)
+            self.flush_scheduled = True
+        if threading.get_ident() == self.loop_thread:
+            self.loop.call_soon(self._flush)
+        else:
+            self.loop.call_soon_threadsafe(self._flush)
+        return len(text)
+
+    def flush(self):
+        # Çıktı döngünün turu bitince tek seferde yazılır
+        pass
+
+    def install(self):
+        self.saved_stdout = sys.stdout
+        sys.stdout = self
+
+    def uninstall(self):
+        """Bekleyen çıktıyı yazar ve sys.stdout'u geri verir"""
+        if self.frame is not None:
+            self.frame.cancel()
+            self.frame = None
+        self.prompt = None
+        self._emit(self._take(), None)
+        if sys.stdout is self:
+            sys.stdout = self.saved_stdout
+
+    # --- Komut istemi ve durum satırı ---
+
+    def show_prompt(self, prompt, gap=True):
+        """Bekleyen çıktıyı, durum satırını ve komut istemini yazar"""
+        self._emit(self._take() + ("\n" if gap else ""), prompt)
+
+    def input_received(self):
+        """Kullanıcı satırı gönderdi: istem ve üstündeki durum satırı artık geçmişte kaldı"""
+        self.prompt = None
+        self.drawn = None
+
+    def set_status(self, segments):
+        """Durum satırını [(stil, metin)] parçalarından ayarlar (None: satırı temizle)"""
+        if not self.tty:
+            return
+        cells = None
+        if segments:
+            width = shutil.get_terminal_size().columns - 1
+            cells = [(style, char) for style, text in segments for char in text][:width]
+        self.status = cells
+        if self.frame is None:
+            delay = max(0.0, self.last_frame + self.FRAME_INTERVAL - self.loop.time())
+            self.frame = self.loop.call_later(delay, self._draw_frame)
+
+    def _take(self):
+        with self.lock:
+            text = "".join(self.buffer)
+            self.buffer = []
+            self.flush_scheduled = False
+        return text
+
+    def _flush(self):
+        text = self._take()
+        if text:
+            # Terminal değilse (dosya, boru) istem yeniden yazılmaz
+            self._emit(text, self.prompt if self.tty else None)
+
+    def _emit(self, text, prompt):
+        """text'i yazar; prompt verilirse altına durum satırını ve istemi çizer"""
+        out = []
+        if self.prompt is not None and self.tty:
+            # Ekrandaki istemi ve üstündeki durum satırını sil, mesaj onların yerine yazılır
+            if self.drawn is not None:
+                out.append("\x1b[1A")
+            out.append("\r\x1b[J")
+            if text and not text.endswith("\n"):
+                text += "\n"
+        out.append(text)
+        self.drawn = None
+        if prompt is not None:
+            if self.status and self.tty:
+                out.append(self._render(self.status) + "\n")
+                self.drawn = self.status
+            out.append(prompt)
+        self.prompt = prompt
+        self.stream.write("".join(out))
+        self.stream.flush()
+
+    def _draw_frame(self):
+        self.frame = None
+        self.last_frame = self.loop.time()
+        if self.prompt is None:
+            # Komut çalışırken çizilmez, durum satırı sonraki istemle gelir
+            return
+        if self.drawn is None:
+            if self.status:
+                self._emit("", self.prompt)
+            return
+
+        old, new = self.drawn, self.status or []
+        start = 0
+        while start < min(len(old), len(new)) and old[start] == new[start]:
+            start += 1
+        end = len(new)
+        if len(old) == len(new):
+            while end > start and old[end - 1] == new[end - 1]:
+                end -= 1
+        if start == end and len(old) <= len(new):
+            return
+
+        # İmleci kaydet, durum satırında ilk değişen hücreye git, yalnızca farkı yaz
+        out = ["\x1b7\x1b[1A\r"]
+        if start:
+            out.append(f"\x1b[{start}C")
+        out.append(self._render(new[start:end]))
+        if len(new) < len(old):
+            out.append("\x1b[K")
+        out.append("\x1b8")
+        self.drawn = new
+        self.stream.write("".join(out))
+        self.stream.flush()
+
+    def _render(self, cells):
+        out = []
+        current = ""
+        for style, char in cells:
+            if style != current:
+                out.append(self.RESET + style)
+                current = style
+            out.append(char)
+        if current:
+            out.append(self.RESET)
+        return "".join(out)
+
+
 class SimpleMusicPlayer:
+    # İlk taramada o ana kadar bulunan dosyaların listeye yüklenme aralığı (sn)
+    PARTIAL_LOAD_INTERVAL = 1.0
+
+    # Komut isteminde gösterilen en fazla arama sonucu (en iyileri)
+    SEARCH_LIMIT = 500
+
+    # 'stats' komutunda ölçüm adlarının karşılıkları
+    METRIC_LABELS = {
+        "refresh": "Yenileme (toplam)",
+        "scan": "Dizin taraması",
+        "tag_read": "Etiket okuma (dosya)",
+        "play": "play komutu",
+        "track_switch": "Şarkı geçişi (komut→ses)",
+        "search": "Arama",
+        "info": "Şarkı bilgisi okuma",
+        "dupes": "Kopya arama",
+        "waveform": "Dalga formu hesaplama",
+        "scan.files": "Taranan dosya",
+        "metadata.hit": "Şarkı bilgisi önbellekten",
+        "metadata.miss": "Şarkı bilgisi dosyadan",
+        "readahead.bytes": "Önceden okunan bayt",
+        "spawn.mpv": "Başlatılan mpv süreci",
+        "spawn.tag_worker": "Başlatılan etiket işlemi",
+        "waveform.hit": "Dalga formu önbellekten",
+        "spawn.waveform_decoder": "Başlatılan dalga formu çözücüsü",
+    }
+
     def __init__(self):
         # Colorama desteği varsa etkinleştir
         if COLORAMA_AVAILABLE:
@@ -31,42 +2498,109 @@ class SimpleMusicPlayer:
         self.show_banner()
         
         # Önce mpv'nin yüklü olup olmadığını kontrol et
-        try:
-            subprocess.run(['which', 'mpv'], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        except subprocess.CalledProcessError:
+        # (TERMUS_MPV ile farklı bir mpv ya da test için sahte mpv verilebilir)
+        self.mpv_path = os.environ.get("TERMUS_MPV", "mpv")
+        if shutil.which(self.mpv_path) is None:
             self.print_error("mpv yüklü değil. Lütfen 'sudo xbps-install -S mpv' komutu ile yükleyin.")
             sys.exit(1)
             
-        # Playerctl kontrolü
-        try:
-            subprocess.run(['which', 'playerctl'], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            self.playerctl_available = True
-        except subprocess.CalledProcessError:
-            self.playerctl_available = False
-            self.print_warning("playerctl yüklü değil. İlerleme çubuğu özelliği devre dışı.")
-
-        # Müzik klasörü
-        self.music_dir = os.path.expanduser("~/Müzik")
-        if not os.path.exists(self.music_dir):
-            self.print_warning(f"{self.music_dir} klasörü bulunamadı. Lütfen müzik klasörünü 'dir' komutu ile ayarlayın.")
+        # Müzik klasörleri (TERMUS_MUSIC_DIRS ile ':' ayrılmış birden çok kök verilebilir)
+        music_dirs = os.environ.get("TERMUS_MUSIC_DIRS", "").split(os.pathsep)
+        self.roots = [LibraryRoot(path) for path in normalize_roots(
+            [path for path in music_dirs if path] or ["~/Müzik"])]
+        for root in self.roots:
+            if not os.path.exists(root.path):
+                self.print_warning(f"{root.path} klasörü bulunamadı. Lütfen müzik klasörünü 'dir' komutu ile ayarlayın.")
             
         # Desteklenen formatlar
         self.supported_formats = ['.mp3', '.wav', '.ogg', '.flac', '.m4a']
-        # Tüm şarkıları bul
-        self.playlist = []
-        self.refresh_playlist()
         # Durum değişkenleri
         self.current_song_index = 0
         self.playing = False
-        self.player_process = None
+        self.paused = False
+        # Komutlar, mpv olayları ve zamanlayıcılar tek olay döngüsünde işlenir;
+        # arka plan thread'leri durumu yalnızca call_soon_threadsafe ile değiştirir
+        self.loop = asyncio.get_running_loop()
+        self.closed = asyncio.Event()
+        # Tüm çıktı tek katmandan yazılır (console() sys.stdout yerine koyar)
+        self.screen = Screen(sys.stdout, self.loop)
+        self.player = MpvBackend(self.mpv_path, loop=self.loop)
+        self.player.on_event = self.handle_player_event
+        # İlerleme çubuğu için konum ve süre değişikliklerini mpv bildirir
+        self.player.observe("time-pos")
+        self.player.observe("duration")
+        # Kesintisiz geçişi fark etmek için çalan dosyanın yolu
+        self.player.observe("path")
+        # mpv'nin listesine önceden eklenen sıradaki şarkı
+        self.queued_index = None
+        self.queued_path = None
+        # mpv çalan dosyayı döngüye aldı mı (loop-file); döngü başa sardığında playback-restart gelir
+        self.looping = False
+        # Beklenen playback-restart (yükleme veya sarma); bunlar döngü sayılmaz
+        self.restart_expected = False
+        # Kullanıcının sıraya eklediği şarkılar (album komutu); listedeki sıradan önce çalınır
+        self.play_queue = deque()
+        # Program nasıl kapanırsa kapansın arka plandaki mpv'yi kapat
+        atexit.register(self.player.quit)
         self.volume = 50  # Yüzde olarak
         self.repeat_mode = 0  # 0: Kapalı, 1: Tümünü Tekrarla, 2: Birini Tekrarla
         
-        # Otomatik olarak şarkı değiştirmeyi kontrol etmek için
-        self.player_checker = None
-        self.should_stop = False
-        self.progress_thread = None
-        self.should_stop_progress = False
+        # İlerleme çubuğu
+        self.progress_active = False
+        # Son play komutunun zamanı (mpv sesi başlatınca geçiş süresi kaydedilir)
+        self.switch_started = None
+        self.last_progress = None
+
+        # Tüm şarkıları bul (önceki taramalar diskteki indekste tutulur)
+        self.library = LibraryIndex(self.supported_formats)
+        self.tag_scanner = TagScanner(self.library)
+        self.tag_scanner.on_finish = functools.partial(self.loop.call_soon_threadsafe, self.tag_scan_finished)
+        self.search_index = SearchIndex()
+        # Şarkı bilgisi önbelleği (kayıt sınırı TERMUS_METADATA_CACHE ile değiştirilebilir)
+        self.metadata = MetadataCache(env_int("TERMUS_METADATA_CACHE", 512))
+        # Sıradaki şarkıları önceden diskten okuma (şarkı sayısı ve MB cinsinden bütçe)
+        self.readahead = ReadAhead(env_int("TERMUS_READAHEAD_TRACKS", 3),
+                                   env_int("TERMUS_READAHEAD_MB", 256) << 20)
+        self.watcher = LibraryWatcher(self.library_changed) if LibraryWatcher.available() else None
+        # Durum satırındaki dalga formu (wave komutu, NumPy gerekir)
+        self.waveforms = WaveformCache(self.mpv_path)
+        self.waveforms.on_ready = functools.partial(self.loop.call_soon_threadsafe, self.waveform_ready)
+        self.show_waveform = False
+        # Çalma geçmişi; history_path geçmişe "play" olarak yazılmış, henüz bitmemiş şarkı
+        self.history = PlayHistory(loop=self.loop)
+        self.history_path = None
+        # Kökler ayrı thread'lerde taranır, yavaş bir bağlama noktası diğerlerini bekletmez
+        self.scan_pool = ThreadPoolExecutor(max(1, env_int("TERMUS_SCAN_THREADS", 4)), "termus-scan")
+        # Kopya araması (dupes); gizleme açıksa fazla kopyalar çalma listesine alınmaz
+        self.duplicates = DuplicateFinder(self.library)
+        self.duplicate_groups = None
+        self.hide_duplicates = False
+        self.hidden_duplicates = set()
+        self.dupes_task = None
+        # Arama sonuçlarından seçim bekleniyorsa sonuç listesi
+        self.search_results = None
+        self.search_page = 0
+        # Çalma listesinde en son gösterilen sayfa (list +/-)
+        self.list_page = 0
+        # Sanatçı ve albüm görünümlerinde en son gösterilen sayfalar (artists/albums +/-)
+        self.artists_page = 0
+        self.albums_page = 0
+        self.albums_artist = None
+        self.playlist = TrackTable()
+        # Karıştırma açıkken sıradaki şarkıları belirler (kapalıyken None)
+        self.shuffle_order = None
+        # Önceki oturum (çalan şarkı ve konumu, ses, modlar, çalma sırası)
+        self.session_path = os.path.join(cache_dir(), "session.json")
+        self.queue_path = os.path.join(cache_dir(), "queue.m3u8")
+        # (yol, saniye): bu şarkı çalınınca kaldığı yerden başlar
+        self.resume_position = None
+        self.resume_at = None
+        # Önceki oturumdan kalan karıştırma sırası (ilk yüklemede kullanılır)
+        self.restored_shuffle = None
+        self.restore_session()
+        # Komut istemi beklemeden açılsın diye tarama arka planda yapılır
+        self.scan_task = None
+        self.refresh_playlist(partial=True)
 
     def show_banner(self):
         """Program başlığını gösterir"""
@@ -109,187 +2643,655 @@ class SimpleMusicPlayer:
         else:
             print(f"[HATA] {message}")
 
-    def refresh_playlist(self):
-        """Müzik dizininden tüm desteklenen müzik dosyalarını tarar"""
-        self.playlist = []
+    def refresh_playlist(self, partial=False, roots=None):
+        """Müzik klasörlerini indeksle karşılaştırır, yalnızca değişen dizinleri yeniden tarar
+
+        Tarama thread havuzunda sürer, komut istemi beklemez; tarama görevini döndürür.
+        partial=True ise tarama bitmeden indeksteki mevcut kayıtlar (ilk taramada o ana
+        kadar bulunan dosyalar) listeye yüklenir. roots verilirse yalnızca o kökler
+        taranır, diğerlerinin kayıtları indeksten alınır.
+        """
+        # Hiçbir klasör mevcut değilse boş liste
+        if not self.root_paths():
+            self.playlist = TrackTable()
+            return None
+
+        if self.is_scanning():
+            self.print_warning("Müzik klasörü zaten taranıyor.")
+            return None
+
+        if roots is None:
+            roots = self.roots
+        roots = [root for root in roots if os.path.isdir(root.path)]
+        if roots:
+            self.print_info(f"Müzik klasörü taranıyor: {', '.join(root.path for root in roots)}")
+        self.scan_task = self.loop.create_task(self.scan_library(partial, roots))
+        self.scan_task.add_done_callback(self.report_task_error)
+        return self.scan_task
+
+    async def scan_library(self, partial, roots):
+        """Kökleri aynı anda tarar ve birleşen sonucu çalma listesine yükler"""
+        started = time.perf_counter()
+        paths = self.root_paths()
+        progress = None
+        if partial:
+            # Önceki oturumdan indekste kalan liste tarama bitmeden kullanılabilir
+            self.load_records(await self.loop.run_in_executor(None, self.library_records, paths))
+            last_load = [time.monotonic()]
+
+            def progress():
+                # Tarama thread'lerinde çağrılır, listeyi olay döngüsü değiştirir
+                if time.monotonic() - last_load[0] >= self.PARTIAL_LOAD_INTERVAL:
+                    last_load[0] = time.monotonic()
+                    self.loop.call_soon_threadsafe(self.load_records, self.library_records(paths))
+
+        scan_started = time.perf_counter()
+        results = await asyncio.gather(*(self.scan_root(root, progress) for root in roots))
+        if roots:
+            metrics.record("scan", time.perf_counter() - scan_started)
+        added, removed, updated = (sum(counts) for counts in zip((0, 0, 0), *results))
+        if added or removed or updated:
+            self.print_info(f"{added} yeni, {removed} silinmiş, {updated} değişmiş dosya.")
+
+        if not partial or added or removed or updated:
+            self.load_records(await self.loop.run_in_executor(None, self.library_records, paths))
+
+        self.print_success(f"Toplam {len(self.playlist)} müzik dosyası bulundu.")
+        metrics.count("scan.files", len(self.playlist))
+        metrics.record("refresh", time.perf_counter() - started)
+
+        # Yeni veya değişmiş dosyaların etiketlerini arka planda oku
+        if MUTAGEN_AVAILABLE:
+            self.tag_scanner.start()
+
+    async def scan_root(self, root, progress=None):
+        """Tek bir kökü tarama havuzunda tarar, (eklenen, silinen, güncellenen) sayılarını döndürür"""
+        root.scanning = True
+        root.error = None
+        started = time.perf_counter()
+        scan = functools.partial(self.library.scan, root.path, progress=progress)
+        try:
+            counts = await self.loop.run_in_executor(self.scan_pool, scan)
+            root.files = await self.loop.run_in_executor(self.scan_pool, self.library.count, root.path)
+        except (OSError, sqlite3.Error) as e:
+            root.error = str(e)
+            self.print_error(f"{root.path} taranamadı: {e}")
+            counts = (0, 0, 0)
+        finally:
+            root.scanning = False
+        root.elapsed = time.perf_counter() - started
+        root.scanned_at = time.time()
+        return counts
+
+    def root_paths(self):
+        """Mevcut kök dizinlerin yolları"""
+        return [root.path for root in self.roots if os.path.isdir(root.path)]
+
+    def library_records(self, paths):
+        """Köklerin indeks kayıtlarını tek sıralı listede birleştirir (thread'de çalışabilir)"""
+        return merge_records([self.library.records(path) for path in paths])
+
+    def load_records(self, records):
+        """İndeks kayıtlarını çalma listesine ve arama indeksine yükler"""
+        current_song = self.playlist[self.current_song_index] if self.playlist else None
+        if current_song is None and self.resume_position is not None:
+            # Önceki oturumda çalan şarkı
+            current_song = self.resume_position[0]
+        if self.hidden_duplicates:
+            records = [record for record in records if record[0] not in self.hidden_duplicates]
+        # İndeks yolları sıralı döndürür
+        self.playlist = TrackTable(record[0] for record in records)
         
-        # Klasör mevcut değilse boş liste döndür
-        if not os.path.exists(self.music_dir):
+        # Çalan şarkının yeni listedeki yerini bul
+        index = self.find_song(current_song) if current_song else None
+        self.current_song_index = index if index is not None else 0
+        # Şarkı numaraları değişti, karıştırma sırası yeniden başlar
+        # (önceki oturumun sırası, liste aynı sayıda şarkıyla ilk yüklendiğinde sürdürülür)
+        if self.shuffle_order is not None:
+            restored = self.restored_shuffle
+            if restored is not None and restored.size == self.playlist.id_count():
+                self.shuffle_order = restored
+            else:
+                self.shuffle_order = ShuffleOrder(self.playlist.id_count(), self.current_track())
+            if self.playlist:
+                self.restored_shuffle = None
+        self.queue_next()
+        self.search_index.sync_async(records)
+
+    def is_scanning(self):
+        """Müzik klasörü arka planda taranıyor mu"""
+        return self.scan_task is not None and not self.scan_task.done()
+
+    def report_task_error(self, task):
+        """Arka plan görevinde yakalanmamış hata varsa gösterir"""
+        if not task.cancelled() and task.exception() is not None:
+            self.print_error(f"Hata: {task.exception()}")
+
+    def find_song(self, path):
+        """Dosyanın çalma listesindeki indeksini döndürür (yoksa None)"""
+        return self.playlist.find(path)
+
+    def toggle_watch(self):
+        """Müzik dizinindeki değişiklikleri canlı izlemeyi açar veya kapatır"""
+        if self.watcher is None:
+            self.print_warning("Canlı izleme yalnızca Linux'ta (inotify) kullanılabilir.")
             return
-            
-        self.print_info(f"Müzik klasörü taranıyor: {self.music_dir}")
-        for ext in self.supported_formats:
-            pattern = os.path.join(self.music_dir, f"*{ext}")
-            files = glob.glob(pattern)
-            self.print_info(f"{ext} uzantılı {len(files)} dosya bulundu.")
-            self.playlist.extend(files)
-            
-        # Alt klasörleri de tara
-        for root, dirs, files in os.walk(self.music_dir):
-            for file in files:
-                if any(file.endswith(ext) for ext in self.supported_formats):
-                    full_path = os.path.join(root, file)
-                    if full_path not in self.playlist:
-                        self.playlist.append(full_path)
-        
-        self.playlist.sort()
-        self.print_success(f"Toplam {len(self.playlist)} müzik dosyası bulundu.")
+        if self.watcher.is_running():
+            self.watcher.stop()
+            self.print_info("Canlı izleme kapatıldı.")
+            return
+        paths = self.root_paths()
+        try:
+            self.watcher.start(paths)
+        except OSError as e:
+            self.print_error(f"Canlı izleme başlatılamadı: {e}")
+            return
+        self.print_success(f"{', '.join(paths)} izleniyor ({len(self.watcher.watches)} dizin).")
+        if self.watcher.limit_reached:
+            self.print_warning("inotify izleme sınırına ulaşıldı, bazı alt dizinler izlenmiyor "
+                               "(fs.inotify.max_user_watches).")
+
+    def library_changed(self, dirs):
+        """İzleyicinin bildirdiği dizinleri tarar (izleyici thread'inde), farkı olay döngüsüne iletir"""
+        changes = {}
+        for root in self.root_paths():
+            prefix = os.path.join(root, "")
+            force_dirs = {path for path in dirs if path == root or path.startswith(prefix)}
+            if force_dirs:
+                self.library.scan(root, force_dirs=force_dirs, changes=changes)
+        if changes["added"] or changes["removed"] or changes["updated"]:
+            self.loop.call_soon_threadsafe(self.apply_library_changes, changes)
+
+    def apply_library_changes(self, changes):
+        """Taramada bulunan farkı çalma listesine ve arama indeksine uygular"""
+        added, removed, updated = changes["added"], changes["removed"], changes["updated"]
+        current_song = self.playlist[self.current_song_index] if self.playlist else None
+        self.playlist.update(added, removed)
+        index = self.find_song(current_song) if current_song else None
+        if index is None:
+            index = min(self.current_song_index, max(len(self.playlist) - 1, 0))
+        self.current_song_index = index
+        # Yeni dosyalar yeni şarkı numaraları aldı, karıştırma onları da kapsamalı
+        if self.shuffle_order is not None and self.shuffle_order.size != self.playlist.id_count():
+            self.shuffle_order.resize(self.playlist.id_count(), self.current_track())
+        self.queue_next()
+
+        for path in removed:
+            self.search_index.remove(path)
+        for path in added:
+            self.search_index.add(path, (None, None, None))
+        if MUTAGEN_AVAILABLE and (added or updated):
+            self.tag_scanner.start()
+        self.print_info(f"Kütüphane güncellendi: {len(added)} yeni, {len(removed)} silinmiş, "
+                        f"{len(updated)} değişmiş dosya.")
+
+    def scan_tags(self, cancel=False):
+        """Etiket taramasını başlatır, iptal eder veya ilerlemesini gösterir"""
+        scanner = self.tag_scanner
+        if cancel:
+            if scanner.is_running():
+                scanner.cancel()
+                self.print_info("Etiket taraması iptal ediliyor...")
+            else:
+                self.print_warning("Çalışan bir etiket taraması yok.")
+            return
+
+        if not MUTAGEN_AVAILABLE:
+            self.print_warning("Mutagen kütüphanesi yüklü değil. Etiketler okunamıyor.")
+            return
+
+        if scanner.is_running():
+            percent = 100 * scanner.done // scanner.total if scanner.total else 0
+            self.print_info(f"Etiketler okunuyor: {scanner.done}/{scanner.total} (%{percent})")
+        else:
+            scanner.start()
+            self.print_info("Etiket taraması başlatıldı.")
+
+    def tag_scan_finished(self, count, cancelled):
+        """Etiket taraması bitince olay döngüsünde çağrılır"""
+        if cancelled:
+            self.print_warning(f"Etiket taraması iptal edildi ({count} dosya okundu).")
+        elif count:
+            rate = count / self.tag_scanner.elapsed if self.tag_scanner.elapsed else 0
+            self.print_success(f"{count} dosyanın etiketi okundu ({rate:.0f} dosya/sn).")
+        # Arama indeksine yeni etiketleri ekle
+        if count:
+            self.loop.run_in_executor(None, self.sync_search_index, self.root_paths())
+
+    def sync_search_index(self, paths):
+        """Arama indeksini diskteki indeksin güncel kayıtlarıyla yeniler (thread havuzunda çalışır)"""
+        self.search_index.sync_async(self.library_records(paths))
 
     def play(self):
         """Mevcut şarkıyı çalar"""
         if not self.playlist:
-            self.print_warning("Çalma listesi boş.")
+            if self.is_scanning():
+                self.print_warning("Çalma listesi boş, müzik klasörü hâlâ taranıyor.")
+            else:
+                self.print_warning("Çalma listesi boş.")
             return
             
-        # Eğer zaten bir oynatıcı çalışıyorsa durdur
-        self.stop()
-        
+        started = time.perf_counter()
         song_path = self.playlist[self.current_song_index]
-        if COLORAMA_AVAILABLE:
-            print(f"{Fore.GREEN}Çalınıyor: {Fore.WHITE}{os.path.basename(song_path)}")
-        else:
-            print(f"Çalınıyor: {os.path.basename(song_path)}")
+        if self.playing:
+            # Çalan şarkı bitmeden değiştirildi
+            self.history_finish("skip")
+        self.print_now_playing()
+        # Önceki oturumun şarkısı kaldığı yerden devam eder (yalnızca ilk kez)
+        if self.resume_position is not None:
+            if self.resume_position[0] == song_path and self.resume_position[1] > 0:
+                self.resume_at = self.resume_position[1]
+            self.resume_position = None
         
-        # mpv ile çal
+        # Çalışan mpv'ye dosyayı yükle (gerekirse mpv'yi bir kez başlat)
         try:
-            self.player_process = subprocess.Popen(
-                ['mpv', '--no-video', f'--volume={self.volume}', song_path],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL
-            )
+            self.player.start(self.volume)
+            self.player.loadfile(song_path)
+            self.restart_expected = True
+            if self.paused:
+                self.player.set_pause(False)
+                self.paused = False
             self.playing = True
+            self.history_start(song_path)
             
-            # Oynatıcı durumunu kontrol eden thread'i başlat
-            self.start_player_checker()
+            # Sıradaki şarkıyı kesintisiz geçiş için hazırla
+            self.queue_next()
+            self.prefetch_metadata(song_path)
             
             # İlerleme çubuğunu başlat
-            if self.playerctl_available:
-                self.start_progress_display()
+            self.start_progress_display()
+            
+            # Şarkı geçişi mpv sesi başlattığında (playback-restart) ölçülür
+            self.switch_started = started
+            metrics.record("play", time.perf_counter() - started)
             
         except Exception as e:
             self.print_error(f"Oynatma hatası: {e}")
             self.playing = False
 
-    def start_player_checker(self):
-        """Oynatıcının durumunu kontrol eden thread'i başlatır"""
-        if self.player_checker is not None:
+    def print_now_playing(self):
+        """Çalan şarkının adını yazdırır (bilgisi önbellekteyse sanatçı ve başlıkla)"""
+        song_path = self.playlist[self.current_song_index]
+        song_name = os.path.basename(song_path)
+        metadata = self.metadata.peek(song_path)
+        if metadata is not None and metadata[0] and metadata[1]:
+            song_name += f" ({metadata[0]} - {metadata[1]})"
+        if COLORAMA_AVAILABLE:
+            print(f"{Fore.GREEN}Çalınıyor: {Fore.WHITE}{song_name}")
+        else:
+            print(f"Çalınıyor: {song_name}")
+
+    def current_track(self):
+        """Mevcut şarkının numarası (liste boşsa None)"""
+        if not self.playlist:
+            return None
+        return self.playlist.order[self.current_song_index]
+
+    def upcoming_index(self):
+        """Mevcut şarkı bitince tekrar moduna göre çalınacak şarkının indeksi (yoksa None)"""
+        if not self.playlist:
+            return None
+        if self.repeat_mode == 2:  # Bir şarkıyı tekrarla
+            return self.current_song_index
+        queued = self.queue_head_index()
+        if queued is not None:
+            return queued
+        if self.shuffle_order is not None:
+            track = self.shuffle_order.peek(self.current_track(), self.playlist, repeat=self.repeat_mode == 1)
+            return None if track is None else self.playlist.position(track)
+        next_index = (self.current_song_index + 1) % len(self.playlist)
+        if self.repeat_mode == 1 or next_index > 0:  # Tümünü tekrarla veya son şarkı değilse
+            return next_index
+        return None
+
+    def upcoming_paths(self, count):
+        """Tekrar moduna ve karıştırmaya göre sırada çalınacak en çok count şarkının yolu"""
+        if not self.playlist or self.repeat_mode == 2 or count <= 0:
+            return []
+        paths = list(itertools.islice(self.play_queue, count))
+        count -= len(paths)
+        if count <= 0:
+            return paths
+        if self.shuffle_order is not None:
+            tracks = self.shuffle_order.upcoming(self.playlist, count)
+            return paths + [self.playlist.path(track) for track in tracks]
+        index = self.current_song_index
+        for _ in range(min(count, len(self.playlist) - 1)):
+            index += 1
+            if index == len(self.playlist):
+                if self.repeat_mode != 1:
+                    break
+                index = 0
+            paths.append(self.playlist[index])
+        return paths
+
+    def queue_head_index(self):
+        """Sıraya eklenmiş ilk şarkının listedeki indeksi (sıra boşsa None)
+
+        Silinmiş dosyaları ve zaten çalmakta olan şarkıyı sıradan çıkarır.
+        """
+        while self.play_queue:
+            index = self.find_song(self.play_queue[0])
+            if index is not None and not (self.playing and index == self.current_song_index):
+                return index
+            self.play_queue.popleft()
+        return None
+
+    def queue_next(self):
+        """Sıradaki şarkıyı mpv'nin listesine ekler, böylece geçiş boşluksuz olur"""
+        self.queued_index = None
+        self.queued_path = None
+        self.looping = False
+        if not (self.playing and self.player.is_alive()):
+            self.readahead.cancel()
             return
-            
-        self.should_stop = False
-        self.player_checker = threading.Thread(target=self.check_player_loop)
-        self.player_checker.daemon = True
-        self.player_checker.start()
-        
-    def check_player_loop(self):
-        """Sürekli olarak oynatıcı durumunu kontrol eder"""
-        while not self.should_stop:
-            if self.playing and self.player_process:
-                # Oynatıcı hala çalışıyor mu kontrol et
-                if self.player_process.poll() is not None:
-                    # Süreç tamamlandı
-                    self.playing = False
-                    
-                    # Şarkı modu kontrolü
-                    if self.repeat_mode == 2:  # Bir şarkıyı tekrarla
-                        self.play()
-                    elif self.repeat_mode == 1 or self.repeat_mode == 0:  # Tümünü tekrarla veya tekrarlama kapalı
-                        self.next_song()
-                        if self.repeat_mode == 1 or self.current_song_index > 0:  # Tümünü tekrarla veya son şarkı değilse çal
-                            self.play()
-            time.sleep(1)  # Her saniye kontrol et
+        # Sıra değişti: önceden okuma yeni sıradan devam eder
+        self.readahead.schedule(self.upcoming_paths(self.readahead.tracks))
+        upcoming = self.upcoming_index()
+        # Aynı şarkı tekrar çalınacaksa (birini tekrarla veya tek şarkılık liste) mpv dosyayı döngüye alır
+        loop = upcoming == self.current_song_index and (self.repeat_mode == 2 or len(self.playlist) == 1)
+        self.player.send("playlist-clear")
+        self.player.send("set_property", "loop-file", "inf" if loop else "no")
+        self.looping = loop
+        if upcoming is not None and not loop:
+            self.queued_index = upcoming
+            self.queued_path = self.playlist[upcoming]
+            self.player.loadfile(self.queued_path, "append")
+            # Sıradaki şarkının bilgisi çalan şarkı sürerken okunur
+            self.prefetch_metadata(self.queued_path)
+
+    def prefetch_metadata(self, path):
+        """Dosyanın bilgisini thread havuzunda önbelleğe okur"""
+        if MUTAGEN_AVAILABLE:
+            self.loop.run_in_executor(None, self._prefetch_metadata, path)
+
+    def _prefetch_metadata(self, path):
+        try:
+            self.metadata.load(path)
+        except OSError:
+            pass
+
+    def handle_track_event(self, event):
+        """Şarkı başlangıç/bitiş olaylarına göre çalma durumunu günceller"""
+        if not self.playing:
+            return
+
+        if event['event'] == 'property-change':
+            # mpv sıraya eklenen şarkıya kesintisiz geçti
+            if self.queued_path is not None and event.get('data') == self.queued_path:
+                if self.play_queue and self.play_queue[0] == self.queued_path:
+                    self.play_queue.popleft()
+                elif self.shuffle_order is not None and self.repeat_mode != 2:
+                    self.shuffle_order.next(self.current_track(), self.playlist, self.repeat_mode == 1)
+                self.current_song_index = self.queued_index
+                self.history_finish("complete")
+                self.history_start(self.queued_path)
+                # Yeni dosyanın playback-restart'ı döngü sayılmaz
+                self.restart_expected = True
+                self.stop_progress_display()
+                self.print_now_playing()
+                self.start_progress_display()
+                self.queue_next()
+
+        elif event['event'] == 'end-file':
+            # Sırada şarkı yoksa liste bitti (Tekrar kapalı ve son şarkı)
+            if event.get('reason') in ('eof', 'error') and self.queued_path is None:
+                self.history_finish("complete" if event.get('reason') == 'eof' else "skip")
+                self.playing = False
+                self.stop_progress_display()
+                self.next_song()
+
+        elif event['event'] == 'shutdown':
+            self.playing = False
+            self.stop_progress_display()
+            if event.get('error'):
+                self.print_error(f"Oynatma hatası: {event['error']}")
+            else:
+                self.print_warning("mpv beklenmedik şekilde kapandı.")
     
     def start_progress_display(self):
-        """İlerleme çubuğunu gösteren thread'i başlatır"""
-        if self.progress_thread is not None:
+        """İlerleme çubuğunu etkinleştirir (mpv olaylarıyla güncellenir)"""
+        self.last_progress = None
+        self.progress_active = True
+        if self.show_waveform:
+            self.waveforms.request(self.playlist[self.current_song_index])
+
+    def toggle_waveform(self):
+        """İlerleme çubuğunda dalga formunu açar veya kapatır"""
+        if not NUMPY_AVAILABLE:
+            self.print_warning("NumPy yüklü değil. Dalga formu gösterilemiyor.")
             return
-            
-        self.should_stop_progress = False
-        self.progress_thread = threading.Thread(target=self.progress_display_loop)
-        self.progress_thread.daemon = True
-        self.progress_thread.start()
-    
-    def progress_display_loop(self):
-        """Şarkı ilerlemesini gösteren döngü"""
-        # mpv'nin başlaması için biraz bekle
-        time.sleep(2)
-        
-        while not self.should_stop_progress and self.playing:
-            try:
-                # Şarkı süresi ve pozisyonu al
-                # Not: Bazı şarkılar için bu bilgi alınamayabilir
-                duration_cmd = ['playerctl', 'metadata', '--player=mpv', 'mpris:length']
-                duration_output = subprocess.check_output(duration_cmd, stderr=subprocess.DEVNULL).decode().strip()
-                duration = int(duration_output) / 1000000  # mikrosaniye -> saniye
-                
-                position_cmd = ['playerctl', 'position', '--player=mpv']
-                position_output = subprocess.check_output(position_cmd, stderr=subprocess.DEVNULL).decode().strip()
-                position = float(position_output)
-                
-                # İlerleme çubuğu oluştur
-                width = 40
-                progress = int(width * position / duration) if duration > 0 else 0
-                
-                # İlerleme çubuğunu ve zamanı yazdır
-                if COLORAMA_AVAILABLE:
-                    bar = f"{Fore.GREEN}{'█' * progress}{Fore.WHITE}{'░' * (width - progress)}"
-                else:
-                    bar = f"{'█' * progress}{'░' * (width - progress)}"
-                
-                time_info = f"{int(position // 60):02d}:{int(position % 60):02d}/{int(duration // 60):02d}:{int(duration % 60):02d}"
-                
-                # Oynatma modunu göster
-                modes = ["Normal", "Tümünü Tekrarla", "Birini Tekrarla"]
-                mode_text = modes[self.repeat_mode]
-                
-                # Durum satırını yazdır
-                status_line = f"\r{bar} {time_info} | Ses: %{self.volume} | Mod: {mode_text}"
-                print(status_line, end="")
-                
-            except Exception:
-                # Playerctl hatası veya mpv henüz hazır değil
-                pass
-                
-            time.sleep(1)
-        
-        # İlerleme çubuğu durdurulduğunda satırı temizle
-        print("\r" + " " * 80 + "\r", end="")
-    
+        self.show_waveform = not self.show_waveform
+        self.print_success("Dalga formu açık." if self.show_waveform else "Dalga formu kapalı.")
+        if self.playing:
+            if self.show_waveform:
+                self.waveforms.request(self.playlist[self.current_song_index])
+            self.last_progress = None
+            self.draw_progress()
+
+    def waveform_ready(self, path):
+        """Dalga formu hazır olunca çalan şarkınınsa durum satırını yeniden çizer"""
+        if self.playing and self.playlist and self.playlist[self.current_song_index] == path:
+            self.last_progress = None
+            self.draw_progress()
+
+    def handle_player_event(self, event):
+        """mpv olaylarını işler (olay döngüsünde çağrılır)"""
+        name = event.get('event')
+        if name == 'property-change' and event.get('name') in ('time-pos', 'duration'):
+            if self.progress_active and self.playing:
+                self.draw_progress()
+        elif name in ('end-file', 'shutdown') or (name == 'property-change' and event.get('name') == 'path'):
+            self.handle_track_event(event)
+        elif name == 'playback-restart':
+            if self.switch_started is not None:
+                metrics.record("track_switch", time.perf_counter() - self.switch_started)
+                self.switch_started = None
+            if self.restart_expected:
+                self.restart_expected = False
+            elif self.looping and self.playing:
+                # Döngüdeki şarkı başa sardı: bir kez bitmiş, yeniden çalmaya başlamış sayılır
+                self.history_finish("complete")
+                self.history_start(self.playlist[self.current_song_index])
+            if self.resume_at is not None:
+                self.player.seek(self.resume_at, "absolute")
+                self.restart_expected = True
+                self.resume_at = None
+
+    def draw_progress(self):
+        """Durum satırını mpv'nin bildirdiği konum ve süreye göre çizer"""
+        if not self.playlist:
+            return
+        path = self.playlist[self.current_song_index]
+        position = self.player.properties.get('time-pos')
+        duration = self.player.properties.get('duration')
+        if duration is None:
+            # mpv süreyi henüz bildirmediyse önbellekteki süre kullanılır
+            metadata = self.metadata.peek(path)
+            duration = metadata[3] if metadata is not None else None
+        if position is None or duration is None:
+            return
+
+        # mpv konumu saniyede birçok kez bildirir, yalnızca saniye değişince çiz
+        key = (int(position), int(duration))
+        if key == self.last_progress:
+            return
+        self.last_progress = key
+
+        # İlerleme çubuğu oluştur
+        width = 40
+        progress = min(width, int(width * position / duration)) if duration > 0 else 0
+
+        time_info = f"{int(position // 60):02d}:{int(position % 60):02d}/{int(duration // 60):02d}:{int(duration % 60):02d}"
+
+        # Oynatma modunu göster
+        modes = ["Normal", "Tümünü Tekrarla", "Birini Tekrarla"]
+        mode_text = modes[self.repeat_mode]
+        if self.shuffle_order is not None:
+            mode_text += " (Karışık)"
+        info = f" {time_info} | Ses: %{self.volume} | Mod: {mode_text}"
+
+        # Dalga formu hazırsa çubuk onun dilimlerinden oluşur
+        wave = self.waveforms.bar(path, width) if self.show_waveform else None
+        played = wave[:progress] if wave else '█' * progress
+        rest = wave[progress:] if wave and COLORAMA_AVAILABLE else '░' * (width - progress)
+
+        # Durum satırı ekrana yalnızca değişen hücreleriyle yazılır
+        if COLORAMA_AVAILABLE:
+            self.screen.set_status([(Fore.GREEN, played), (Fore.WHITE, rest + info)])
+        else:
+            self.screen.set_status([("", played + rest + info)])
+
     def stop_progress_display(self):
-        """İlerleme çubuğunu durduran fonksiyon"""
-        self.should_stop_progress = True
-        if self.progress_thread:
-            time.sleep(1)  # Thread'in temiz bir şekilde sonlanmasını bekle
-            self.progress_thread = None
-
-    def stop_player_checker(self):
-        """Oynatıcı durumunu kontrol eden thread'i durdurur"""
-        self.should_stop = True
-        if self.player_checker:
-            self.player_checker = None
+        """İlerleme çubuğunu durdurur ve satırı temizler"""
+        if self.progress_active:
+            self.progress_active = False
+            self.screen.set_status(None)
+
+    def stop(self):
+        """Müziği durdurur"""
+        if self.playing:
+            self.history_finish("skip")
+            self.stop_progress_display()
+            self.playing = False
+            self.queued_index = None
+            self.queued_path = None
+            self.readahead.cancel()
+            if self.player.is_alive():
+                self.player.stop()
+            self.paused = False
+            self.print_info("Durduruldu.")
+
+    def toggle_pause(self):
+        """Çalan şarkıyı duraklatır veya devam ettirir"""
+        if not self.playing:
+            self.print_warning("Çalan şarkı yok.")
+            return
+        self.paused = not self.paused
+        self.player.set_pause(self.paused)
+        self.print_info("Duraklatıldı." if self.paused else "Devam ediliyor.")
+
+    def seek(self, seconds):
+        """Çalan şarkıda ileri veya geri sarar (saniye)"""
+        if not self.playing:
+            self.print_warning("Çalan şarkı yok.")
+            return
+        self.player.seek(seconds)
+        self.restart_expected = True
+
+    def quit(self):
+        """Oynatıcıyı ve mpv sürecini kapatır"""
+        self.save_session()
+        # Kapanışta yarıda kalan şarkı atlanmış sayılmaz
+        self.history_path = None
+        self.stop()
+        if self.watcher is not None:
+            self.watcher.stop()
+        self.scan_pool.shutdown(wait=False)
+        # Süren etiket taraması yalnızca yoldaki partileri bitirip kapanır
+        if self.tag_scanner.is_running():
+            self.tag_scanner.cancel()
+            self.tag_scanner.thread.join()
+        self.waveforms.close()
+        self.history.close()
+        self.player.quit()
+        # TERMUS_STATS verilmişse oturumun ölçümleri bu dosyaya yazılır
+        stats_path = os.environ.get("TERMUS_STATS")
+        if stats_path:
+            try:
+                metrics.dump(os.path.expanduser(stats_path))
+            except OSError as e:
+                self.print_error(f"Ölçümler yazılamadı: {e}")
+        self.closed.set()
+
+    def restore_session(self):
+        """Önceki oturumun ses seviyesini, modlarını, çalma sırasını ve konumunu yükler
+
+        Çalan şarkı liste indeksten ilk yüklendiğinde bulunur (load_records); tarama beklenmez.
+        """
+        try:
+            with open(self.session_path) as f:
+                session = json.load(f)
+            volume = max(0, min(100, int(session.get("volume", self.volume))))
+            repeat_mode = int(session.get("repeat_mode", 0)) % 3
+            shuffle = session.get("shuffle")
+            shuffle_order = ShuffleOrder.from_state(shuffle) if isinstance(shuffle, dict) else None
+            path = session.get("path")
+            position = float(session.get("position") or 0)
+            if not math.isfinite(position) or position < 0:
+                raise ValueError("geçersiz konum")
+            if path is not None and not isinstance(path, str):
+                raise TypeError("geçersiz şarkı yolu")
+        except (OSError, ValueError, TypeError, KeyError, AttributeError, OverflowError):
+            # Okunamayan ya da bozuk oturum dosyası yok sayılır
+            return
+        self.volume = volume
+        self.repeat_mode = repeat_mode
+        if shuffle_order is not None:
+            # Liste yüklenince şarkı sayısı aynıysa bu sıra kullanılır (load_records)
+            self.shuffle_order = self.restored_shuffle = shuffle_order
+        self.show_waveform = bool(session.get("waveform")) and NUMPY_AVAILABLE
+        try:
+            self.play_queue.extend(read_m3u(self.queue_path))
+        except OSError:
+            pass
+        if path:
+            self.resume_position = (path, position)
+            self.print_info(f"Önceki oturum: {os.path.basename(path)} "
+                            f"({int(position // 60):02d}:{int(position % 60):02d}), devam etmek için 'play'.")
 
-    def stop(self):
-        """Müziği durdurur"""
-        if self.player_process and self.playing:
-            self.stop_progress_display()
-            self.player_process.terminate()
-            self.player_process.wait()
-            self.player_process = None
-            self.playing = False
-            self.print_info("Durduruldu.")
+    def save_session(self):
+        """Çalan şarkıyı, konumu, ses seviyesini, modları ve çalma sırasını sonraki açılış için yazar"""
+        path = self.playlist[self.current_song_index] if self.playlist else None
+        position = self.player.properties.get('time-pos') if self.playing else None
+        if position is None and self.resume_position is not None and self.resume_position[0] == path:
+            position = self.resume_position[1]
+        session = {
+            "path": path,
+            "position": position or 0,
+            "volume": self.volume,
+            "repeat_mode": self.repeat_mode,
+            "shuffle": self.shuffle_order.to_state() if self.shuffle_order is not None else None,
+            "waveform": self.show_waveform,
+        }
+        try:
+            os.makedirs(os.path.dirname(self.session_path), exist_ok=True)
+            write_m3u(self.queue_path, self.play_queue)
+            fd, temp_path = tempfile.mkstemp(prefix=".termus-", dir=os.path.dirname(self.session_path))
+            with open(fd, "w") as f:
+                json.dump(session, f)
+            os.replace(temp_path, self.session_path)
+        except OSError as e:
+            self.print_error(f"Oturum kaydedilemedi: {e}")
 
     def next_song(self):
-        """Sonraki şarkıya geçer"""
+        """Sonraki şarkıya geçer (sıraya eklenmiş şarkı varsa ona)"""
         if self.playlist:
-            self.current_song_index = (self.current_song_index + 1) % len(self.playlist)
+            queued = self.queue_head_index()
+            if queued is not None:
+                self.play_queue.popleft()
+                self.current_song_index = queued
+            elif self.shuffle_order is not None:
+                track = self.shuffle_order.next(self.current_track(), self.playlist)
+                self.current_song_index = self.playlist.position(track)
+            else:
+                self.current_song_index = (self.current_song_index + 1) % len(self.playlist)
             if self.playing:
                 self.play()
             else:
                 self.print_info(f"Sonraki şarkı: {os.path.basename(self.playlist[self.current_song_index])}")
 
     def prev_song(self):
-        """Önceki şarkıya geçer"""
+        """Önceki şarkıya geçer (karıştırmada gerçekten çalınmış önceki şarkıya)"""
         if self.playlist:
-            self.current_song_index = (self.current_song_index - 1) % len(self.playlist)
+            if self.shuffle_order is not None:
+                track = self.shuffle_order.back(self.current_track(), self.playlist)
+                if track is None:
+                    self.print_warning("Karıştırma geçmişinde önceki şarkı yok.")
+                    return
+                self.current_song_index = self.playlist.position(track)
+            else:
+                self.current_song_index = (self.current_song_index - 1) % len(self.playlist)
             if self.playing:
                 self.play()
             else:
@@ -303,11 +3305,9 @@ class SimpleMusicPlayer:
         else:
             print(f"Ses seviyesi: %{self.volume}")
         
-        # Eğer müzik çalıyorsa ses seviyesini güncelle (mpv yeniden başlatılarak)
-        if self.playing:
-            current_song = self.playlist[self.current_song_index]
-            self.stop()
-            self.play()
+        # mpv çalışıyorsa ses seviyesini yerinde güncelle (şarkı kaldığı yerden devam eder)
+        if self.player.is_alive():
+            self.player.set_volume(self.volume)
 
     def volume_up(self):
         """Ses seviyesini artırır"""
@@ -318,20 +3318,21 @@ class SimpleMusicPlayer:
         self.set_volume(self.volume - 10)
 
     def shuffle(self):
-        """Çalma listesini karıştırır"""
-        if self.playlist:
-            current_song = self.playlist[self.current_song_index]
-            random.shuffle(self.playlist)
-            # Mevcut şarkıyı bul
-            try:
-                self.current_song_index = self.playlist.index(current_song)
-            except ValueError:
-                self.current_song_index = 0
-            self.print_success("Çalma listesi karıştırıldı.")
+        """Karıştırmayı açar veya kapatır (liste sırası değişmez)"""
+        if self.shuffle_order is None:
+            if not self.playlist:
+                return
+            self.shuffle_order = ShuffleOrder(self.playlist.id_count(), self.current_track())
+            self.print_success("Karıştırma açık.")
+        else:
+            self.shuffle_order = None
+            self.print_success("Karıştırma kapalı.")
+        self.queue_next()
 
     def toggle_repeat_mode(self):
         """Tekrar modunu değiştirir: Kapalı -> Tümünü Tekrarla -> Birini Tekrarla -> Kapalı"""
         self.repeat_mode = (self.repeat_mode + 1) % 3
+        self.queue_next()
         modes = ["Kapalı", "Tümünü Tekrarla", "Birini Tekrarla"]
         if COLORAMA_AVAILABLE:
             print(f"{Fore.MAGENTA}Tekrar modu: {Fore.WHITE}{modes[self.repeat_mode]}")
@@ -344,39 +3345,89 @@ class SimpleMusicPlayer:
             return os.path.basename(self.playlist[self.current_song_index])
         return "Şarkı yok"
 
+    def state(self):
+        """Oynatıcının durumunu JSON'a çevrilebilir sözlük olarak döndürür (kontrol soketi)"""
+        path = self.playlist[self.current_song_index] if self.playlist else None
+        metadata = self.metadata.peek(path) if path else None
+        return {
+            "playing": self.playing,
+            "paused": self.paused,
+            "path": path,
+            "index": self.current_song_index + 1 if path else None,
+            "count": len(self.playlist),
+            "artist": metadata[0] if metadata else None,
+            "title": metadata[1] if metadata else None,
+            "position": self.player.properties.get('time-pos') if self.playing else None,
+            "duration": self.player.properties.get('duration') if self.playing else None,
+            "volume": self.volume,
+            "repeat": ["none", "all", "one"][self.repeat_mode],
+            "shuffle": self.shuffle_order is not None,
+            "queue": len(self.play_queue),
+            "scanning": self.is_scanning(),
+        }
+
+    def play_index(self, index):
+        """Çalma listesinde verilen sıradaki şarkıyı çalar"""
+        if not 0 <= index < len(self.playlist):
+            self.print_error(f"Geçersiz sıra. 1-{len(self.playlist)} arasında bir değer girin.")
+            return
+        self.current_song_index = index
+        self.play()
+
     def search_song(self, query):
-        """Şarkı listesinde arama yapar"""
-        query = query.lower()
-        results = []
-        
-        for i, song in enumerate(self.playlist):
-            song_name = os.path.basename(song).lower()
-            if query in song_name:
-                results.append((i, song))
+        """Dosya adı ve etiketlerde arama yapar (örn. 'artist:queen bohemian')"""
+        if self.search_index.is_building():
+            self.print_info("Arama indeksi hazırlanıyor, lütfen bekleyin...")
+        if self.is_scanning():
+            self.print_info("Tarama sürüyor, sonuçlar eksik olabilir.")
+        started = time.perf_counter()
+        results = self.search_index.search(query, limit=self.SEARCH_LIMIT)
+        metrics.record("search", time.perf_counter() - started)
         
         if not results:
             self.print_warning("Sonuç bulunamadı.")
             return
         
+        # Seçim komut isteminden gelen bir sonraki satırla yapılır (choose_search_result)
+        self.search_results = results
+        self.show_search_page(0)
+
+    def show_search_page(self, page):
+        """Arama sonuçlarının bir sayfasını gösterir; yalnızca o sayfa biçimlenir"""
+        results = self.search_results
+        page, pages, start, end = page_window(page, len(results), self.page_size())
+        self.search_page = page
+        
+        count = f"en iyi {len(results)}" if len(results) >= self.SEARCH_LIMIT else len(results)
+        title = f"Arama Sonuçları ({count} sonuç, sayfa {page + 1}/{pages})"
         if COLORAMA_AVAILABLE:
-            print(f"\n{Fore.YELLOW}==== Arama Sonuçları ===={Style.RESET_ALL}")
+            print(f"\n{Fore.YELLOW}==== {title} ===={Style.RESET_ALL}")
         else:
-            print("\n==== Arama Sonuçları ====")
+            print(f"\n==== {title} ====")
             
-        for i, (index, song) in enumerate(results):
-            if COLORAMA_AVAILABLE:
-                print(f"{i+1}. {Fore.GREEN}{os.path.basename(song)}")
-            else:
-                print(f"{i+1}. {os.path.basename(song)}")
-        
-        print("\nÇalmak için numara girin (veya iptal için boş bırakın):")
-        selection = input("> ").strip()
+        name_style = Fore.GREEN if COLORAMA_AVAILABLE else ""
+        print("\n".join(f"{i}. {name_style}{os.path.basename(song)}"
+                        for i, song in enumerate(results[start:end], start + 1)))
         
+        if pages > 1:
+            print("\nÇalmak için numara girin (+/-: sonraki/önceki sayfa, iptal için boş bırakın):")
+        else:
+            print("\nÇalmak için numara girin (veya iptal için boş bırakın):")
+
+    def choose_search_result(self, selection):
+        """Son aramanın sonuçlarından seçileni çalar ya da sayfayı değiştirir"""
+        selection = selection.strip()
+        if selection in ("+", "-"):
+            self.show_search_page(self.search_page + (1 if selection == "+" else -1))
+            return
+        results, self.search_results = self.search_results, None
         if selection and selection.isdigit():
             idx = int(selection) - 1
             if 0 <= idx < len(results):
-                self.current_song_index = results[idx][0]
-                self.play()
+                index = self.find_song(results[idx])
+                if index is not None:
+                    self.current_song_index = index
+                    self.play()
                 
     def show_song_info(self):
         """Çalan şarkının metadata bilgilerini gösterir"""
@@ -391,230 +3442,933 @@ class SimpleMusicPlayer:
             
         song_path = self.playlist[self.current_song_index]
         try:
-            audio = File(song_path)
-            if COLORAMA_AVAILABLE:
-                print(f"\n{Fore.YELLOW}========== Şarkı Bilgileri =========={Style.RESET_ALL}")
-            else:
-                print("\n========== Şarkı Bilgileri ==========")
-            
-            print(f"Dosya: {os.path.basename(song_path)}")
-            
-            if hasattr(audio, 'tags') and audio.tags:
-                # ID3 etiketleri (MP3)
-                tags = audio.tags
-                if 'TPE1' in tags:  # Sanatçı
-                    if COLORAMA_AVAILABLE:
-                        print(f"{Fore.CYAN}Sanatçı: {Fore.WHITE}{tags['TPE1'].text[0]}")
-                    else:
-                        print(f"Sanatçı: {tags['TPE1'].text[0]}")
-                if 'TIT2' in tags:  # Başlık
-                    if COLORAMA_AVAILABLE:
-                        print(f"{Fore.CYAN}Başlık: {Fore.WHITE}{tags['TIT2'].text[0]}")
-                    else:
-                        print(f"Başlık: {tags['TIT2'].text[0]}")
-                if 'TALB' in tags:  # Albüm
-                    if COLORAMA_AVAILABLE:
-                        print(f"{Fore.CYAN}Albüm: {Fore.WHITE}{tags['TALB'].text[0]}")
-                    else:
-                        print(f"Albüm: {tags['TALB'].text[0]}")
+            # Önbellekte yoksa (veya dosya değiştiyse) dosyadan okunur
+            started = time.perf_counter()
+            artist, title, album, length, bitrate, sample_rate = self.metadata.load(song_path)
+            metrics.record("info", time.perf_counter() - started)
+        except OSError as e:
+            self.print_error(f"Meta veriler alınamadı: {e}")
+            return
             
-            # Diğer formatlar için
-            if hasattr(audio, 'info'):
-                info = {
-                    'Süre': f"{int(audio.info.length // 60)}:{int(audio.info.length % 60):02d}",
-                }
-                
-                if hasattr(audio.info, 'bitrate'):
-                    info['Bit hızı'] = f"{audio.info.bitrate // 1000} kbps"
-                    
-                if hasattr(audio.info, 'sample_rate'):
-                    info['Örnekleme hızı'] = f"{audio.info.sample_rate} Hz"
-                
-                for key, value in info.items():
-                    if COLORAMA_AVAILABLE:
-                        print(f"{Fore.CYAN}{key}: {Fore.WHITE}{value}")
-                    else:
-                        print(f"{key}: {value}")
-                    
+        if COLORAMA_AVAILABLE:
+            print(f"\n{Fore.YELLOW}========== Şarkı Bilgileri =========={Style.RESET_ALL}")
+        else:
+            print("\n========== Şarkı Bilgileri ==========")
+        
+        print(f"Dosya: {os.path.basename(song_path)}")
+        
+        info = {}
+        if artist:
+            info['Sanatçı'] = artist
+        if title:
+            info['Başlık'] = title
+        if album:
+            info['Albüm'] = album
+        if length is not None:
+            info['Süre'] = f"{int(length // 60)}:{int(length % 60):02d}"
+        if bitrate:
+            info['Bit hızı'] = f"{bitrate // 1000} kbps"
+        if sample_rate:
+            info['Örnekleme hızı'] = f"{sample_rate} Hz"
+        
+        for key, value in info.items():
             if COLORAMA_AVAILABLE:
-                print(f"{Fore.YELLOW}==================================={Style.RESET_ALL}")
+                print(f"{Fore.CYAN}{key}: {Fore.WHITE}{value}")
             else:
-                print("===================================")
-        except Exception as e:
-            self.print_error(f"Meta veriler alınamadı: {e}")
+                print(f"{key}: {value}")
+                
+        if COLORAMA_AVAILABLE:
+            print(f"{Fore.YELLOW}==================================={Style.RESET_ALL}")
+        else:
+            print("===================================")
 
     def set_music_dir(self, directory):
-        """Müzik dizinini değiştirir"""
+        """Müzik dizinini değiştirir (tüm köklerin yerine tek dizin)"""
+        if self.is_scanning():
+            self.print_warning("Müzik klasörü taranıyor, tarama bitince tekrar deneyin.")
+            return False
         if os.path.isdir(directory):
-            self.music_dir = directory
-            self.refresh_playlist()
+            self.update_roots([directory])
             return True
         else:
             self.print_error(f"{directory} geçerli bir dizin değil.")
             return False
 
+    def add_music_dir(self, directory):
+        """Kütüphaneye yeni bir kök dizin ekler, yalnızca onu tarar"""
+        if self.is_scanning():
+            self.print_warning("Müzik klasörü taranıyor, tarama bitince tekrar deneyin.")
+            return False
+        if not os.path.isdir(directory):
+            self.print_error(f"{directory} geçerli bir dizin değil.")
+            return False
+        paths = [root.path for root in self.roots]
+        if normalize_roots(paths + [directory]) == normalize_roots(paths):
+            self.print_warning(f"{directory} zaten kütüphanede.")
+            return False
+        self.update_roots(paths + [directory])
+        return True
+
+    def remove_music_dir(self, directory):
+        """Kök dizini kütüphaneden çıkarır; diğer kökler yeniden taranmaz"""
+        if self.is_scanning():
+            self.print_warning("Müzik klasörü taranıyor, tarama bitince tekrar deneyin.")
+            return False
+        path = os.path.abspath(os.path.expanduser(directory))
+        paths = [root.path for root in self.roots]
+        if path not in paths:
+            self.print_error(f"{directory} kütüphane kökleri arasında değil.")
+            return False
+        paths.remove(path)
+        self.update_roots(paths)
+        self.print_info(f"{path} kütüphaneden çıkarıldı.")
+        return True
+
+    def update_roots(self, paths):
+        """Kök listesini değiştirir, yalnızca yeni eklenen kökleri tarar"""
+        old = {root.path: root for root in self.roots}
+        self.roots = [old.get(path) or LibraryRoot(path) for path in normalize_roots(paths)]
+        self.refresh_playlist(roots=[root for root in self.roots if root.path not in old])
+        # İzleme açıksa yeni köklere geç
+        if self.watcher is not None and self.watcher.is_running():
+            self.watcher.start(self.root_paths())
+
+    def show_music_dirs(self):
+        """Kök dizinleri ve tarama durumlarını gösterir"""
+        if not self.roots:
+            self.print_warning("Kütüphanede kök dizin yok. 'dir+ [yol]' ile ekleyin.")
+            return
+        if COLORAMA_AVAILABLE:
+            print(f"\n{Fore.CYAN}==== Müzik Klasörleri ===={Style.RESET_ALL}")
+            for root in self.roots:
+                print(f"{Fore.GREEN}{root.path}{Style.RESET_ALL}: {root.status()}")
+        else:
+            print("\n==== Müzik Klasörleri ====")
+            for root in self.roots:
+                print(f"{root.path}: {root.status()}")
+        print()
+
+    def find_duplicates(self, hide=None):
+        """Kopya şarkıları arka planda arar; hide True ise fazla kopyaları listeden gizler, False ise gösterir"""
+        if self.dupes_task is not None and not self.dupes_task.done():
+            self.print_warning("Kopya araması zaten sürüyor.")
+            return
+        if hide is False:
+            if not self.hide_duplicates:
+                self.print_warning("Kopyalar zaten gizli değil.")
+                return
+            self.hide_duplicates = False
+            self.hidden_duplicates = set()
+            self.print_info("Kopyalar yeniden çalma listesinde.")
+        else:
+            self.print_info("Kopya şarkılar aranıyor...")
+        self.dupes_task = self.loop.create_task(self.search_duplicates(hide))
+        self.dupes_task.add_done_callback(self.report_task_error)
+
+    async def search_duplicates(self, hide):
+        """Kopyaları tarama havuzunda bulur, sonucu gösterir ve gizleme açıksa listeyi yeniden yükler"""
+        paths = self.root_paths()
+        if hide is not False:
+            started = time.perf_counter()
+            self.duplicate_groups = await self.loop.run_in_executor(None, self.duplicates.find, paths)
+            elapsed = time.perf_counter() - started
+            metrics.record("dupes", elapsed)
+            if hide:
+                self.hide_duplicates = True
+            self.show_duplicates(elapsed)
+            if not self.hide_duplicates:
+                return
+            # Her grubun (yola göre) ilk dosyası listede kalır
+            self.hidden_duplicates = {path for _, group in self.duplicate_groups for path in group[1:]}
+        self.load_records(await self.loop.run_in_executor(None, self.library_records, paths))
+        if self.hide_duplicates:
+            self.print_success(f"{len(self.hidden_duplicates)} fazla kopya çalma listesinden gizlendi.")
+
+    def show_duplicates(self, elapsed):
+        """Son kopya aramasının sonucunu gösterir"""
+        groups = self.duplicate_groups
+        if not groups:
+            self.print_success(f"Kopya şarkı bulunamadı ({elapsed:.2f} sn).")
+            return
+        extra = sum(len(paths) - 1 for _, paths in groups)
+        wasted = sum(size * (len(paths) - 1) for size, paths in groups)
+        self.print_success(f"{len(groups)} kopya grubu, {extra} fazla dosya ({wasted / 1e6:.1f} MB); "
+                           f"{elapsed:.2f} sn, {self.duplicates.hashed} dosya okundu.")
+        size = self.page_size()
+        lines = []
+        for group_size, paths in groups[:size]:
+            lines.append(f"{len(paths)} kopya ({group_size / 1e6:.1f} MB):")
+            lines.extend(f"  {path}" for path in paths)
+        if len(groups) > size:
+            lines.append(f"... ve {len(groups) - size} grup daha")
+        if not self.hide_duplicates:
+            lines.append("(dupes hide: fazla kopyaları çalma listesinden gizle)")
+        print("\n".join(lines))
+        print()
+
     def show_help(self):
         """Komutları gösterir"""
         if COLORAMA_AVAILABLE:
             print(f"\n{Fore.CYAN}==== Konsol Müzik Oynatıcısı Komutları ===={Style.RESET_ALL}")
             print(f"{Fore.GREEN}play, p      {Fore.WHITE}: Şarkıyı oynat")
+            print(f"{Fore.GREEN}play [sıra]  {Fore.WHITE}: Listede verilen sıradaki şarkıyı oynat")
             print(f"{Fore.GREEN}stop, s      {Fore.WHITE}: Şarkıyı durdur")
+            print(f"{Fore.GREEN}pause        {Fore.WHITE}: Duraklat / devam et")
+            print(f"{Fore.GREEN}seek [sn]    {Fore.WHITE}: İleri/geri sar (örn. seek -10)")
             print(f"{Fore.GREEN}next, n      {Fore.WHITE}: Sonraki şarkı")
             print(f"{Fore.GREEN}prev         {Fore.WHITE}: Önceki şarkı")
             print(f"{Fore.GREEN}vol+, v+     {Fore.WHITE}: Sesi artır")
             print(f"{Fore.GREEN}vol-, v-     {Fore.WHITE}: Sesi azalt")
             print(f"{Fore.GREEN}vol [0-100]  {Fore.WHITE}: Ses seviyesini ayarla")
-            print(f"{Fore.GREEN}shuffle      {Fore.WHITE}: Çalma listesini karıştır")
+            print(f"{Fore.GREEN}shuffle      {Fore.WHITE}: Karıştırmayı aç/kapat")
             print(f"{Fore.GREEN}repeat, r    {Fore.WHITE}: Tekrar modunu değiştir")
+            print(f"{Fore.GREEN}wave         {Fore.WHITE}: İlerleme çubuğunda dalga formunu aç/kapat")
             print(f"{Fore.GREEN}search [metin]{Fore.WHITE}: Şarkı ara")
             print(f"{Fore.GREEN}info, i      {Fore.WHITE}: Çalan şarkı bilgilerini göster")
-            print(f"{Fore.GREEN}list, l      {Fore.WHITE}: Çalma listesini göster")
+            print(f"{Fore.GREEN}list, l      {Fore.WHITE}: Çalma listesini göster (list +/-: sayfa)")
+            print(f"{Fore.GREEN}list [sıra]  {Fore.WHITE}: Listede verilen sıradaki şarkının sayfasına git")
+            print(f"{Fore.GREEN}artists      {Fore.WHITE}: Sanatçıları göster (artists +/-: sayfa)")
+            print(f"{Fore.GREEN}albums [sanatçı]{Fore.WHITE}: Albümleri göster (albums +/-: sayfa)")
+            print(f"{Fore.GREEN}album [ad]   {Fore.WHITE}: Albümü çalma sırasına ekle")
+            print(f"{Fore.GREEN}queue [clear]{Fore.WHITE}: Çalma sırasını göster / temizle")
+            print(f"{Fore.GREEN}top [sayı]   {Fore.WHITE}: En çok çalınan şarkıları göster")
+            print(f"{Fore.GREEN}recent [sayı]{Fore.WHITE}: Son çalınan şarkıları göster")
+            print(f"{Fore.GREEN}save [dosya] {Fore.WHITE}: Çalma sırasını (boşsa listeyi) M3U8 olarak kaydet")
+            print(f"{Fore.GREEN}load [dosya] {Fore.WHITE}: M3U/M3U8 listesini çalma sırasına yükle")
+            print(f"{Fore.GREEN}dupes [hide|show]{Fore.WHITE}: Kopya şarkıları bul (hide/show: listeden gizle/göster)")
             print(f"{Fore.GREEN}dir [yol]    {Fore.WHITE}: Müzik dizinini değiştir")
+            print(f"{Fore.GREEN}dir+, dir- [yol]{Fore.WHITE}: Müzik klasörü ekle / çıkar")
+            print(f"{Fore.GREEN}dirs         {Fore.WHITE}: Müzik klasörlerini ve tarama durumlarını göster")
             print(f"{Fore.GREEN}refresh      {Fore.WHITE}: Çalma listesini yenile")
+            print(f"{Fore.GREEN}tags [stop]  {Fore.WHITE}: Etiket taraması başlat/ilerleme (stop: iptal)")
+            print(f"{Fore.GREEN}watch        {Fore.WHITE}: Müzik dizinini canlı izle (aç/kapat)")
             print(f"{Fore.GREEN}current, c   {Fore.WHITE}: Çalan şarkıyı göster")
+            print(f"{Fore.GREEN}stats        {Fore.WHITE}: Performans ölçümlerini göster")
             print(f"{Fore.GREEN}help, h      {Fore.WHITE}: Bu yardım menüsü")
             print(f"{Fore.GREEN}quit, q      {Fore.WHITE}: Çıkış")
             print(f"{Fore.CYAN}======================================{Style.RESET_ALL}\n")
         else:
             print("\n==== Konsol Müzik Oynatıcısı Komutları ====")
             print("play, p      : Şarkıyı oynat")
+            print("play [sıra]  : Listede verilen sıradaki şarkıyı oynat")
             print("stop, s      : Şarkıyı durdur")
+            print("pause        : Duraklat / devam et")
+            print("seek [sn]    : İleri/geri sar (örn. seek -10)")
             print("next, n      : Sonraki şarkı")
             print("prev         : Önceki şarkı")
             print("vol+, v+     : Sesi artır")
             print("vol-, v-     : Sesi azalt")
             print("vol [0-100]  : Ses seviyesini ayarla")
-            print("shuffle      : Çalma listesini karıştır")
+            print("shuffle      : Karıştırmayı aç/kapat")
             print("repeat, r    : Tekrar modunu değiştir")
+            print("wave         : İlerleme çubuğunda dalga formunu aç/kapat")
             print("search [metin]: Şarkı ara")
             print("info, i      : Çalan şarkı bilgilerini göster")
-            print("list, l      : Çalma listesini göster")
+            print("list, l      : Çalma listesini göster (list +/-: sayfa)")
+            print("list [sıra]  : Listede verilen sıradaki şarkının sayfasına git")
+            print("artists      : Sanatçıları göster (artists +/-: sayfa)")
+            print("albums [sanatçı]: Albümleri göster (albums +/-: sayfa)")
+            print("album [ad]   : Albümü çalma sırasına ekle")
+            print("queue [clear]: Çalma sırasını göster / temizle")
+            print("top [sayı]   : En çok çalınan şarkıları göster")
+            print("recent [sayı]: Son çalınan şarkıları göster")
+            print("save [dosya] : Çalma sırasını (boşsa listeyi) M3U8 olarak kaydet")
+            print("load [dosya] : M3U/M3U8 listesini çalma sırasına yükle")
+            print("dupes [hide|show]: Kopya şarkıları bul (hide/show: listeden gizle/göster)")
             print("dir [yol]    : Müzik dizinini değiştir")
+            print("dir+, dir- [yol]: Müzik klasörü ekle / çıkar")
+            print("dirs         : Müzik klasörlerini ve tarama durumlarını göster")
             print("refresh      : Çalma listesini yenile")
+            print("tags [stop]  : Etiket taraması başlat/ilerleme (stop: iptal)")
+            print("watch        : Müzik dizinini canlı izle (aç/kapat)")
             print("current, c   : Çalan şarkıyı göster")
+            print("stats        : Performans ölçümlerini göster")
             print("help, h      : Bu yardım menüsü")
             print("quit, q      : Çıkış")
             print("======================================\n")
 
-    def show_playlist(self):
-        """Çalma listesini gösterir"""
+    def show_stats(self):
+        """Oturumdaki işlemlerin süre dağılımlarını ve sayaçları gösterir"""
+        data = metrics.to_dict()
+        if COLORAMA_AVAILABLE:
+            print(f"\n{Fore.CYAN}==== Performans Ölçümleri ===={Style.RESET_ALL}")
+        else:
+            print("\n==== Performans Ölçümleri ====")
+            
+        if not data["histograms"] and not data["counters"]:
+            print("Henüz ölçüm yok")
+        if data["histograms"]:
+            print(f"{'İşlem':<26}{'Adet':>7}{'Ort.':>10}{'p50':>10}{'p95':>10}{'En çok':>10}")
+        for name, h in data["histograms"].items():
+            label = self.METRIC_LABELS.get(name, name)
+            print(f"{label:<26}{h['count']:>7}{format_duration(h['mean']):>10}{format_duration(h['p50']):>10}"
+                  f"{format_duration(h['p95']):>10}{format_duration(h['max']):>10}")
+        for name, value in data["counters"].items():
+            print(f"{self.METRIC_LABELS.get(name, name)}: {value}")
+            
+        scan = data["histograms"].get("scan")
+        if scan and scan["total"]:
+            rate = data["counters"].get("scan.files", 0) / scan["total"]
+            print(f"Tarama hızı: {rate:.0f} dosya/sn")
+            
+        if COLORAMA_AVAILABLE:
+            print(f"{Fore.CYAN}============================{Style.RESET_ALL}\n")
+        else:
+            print("============================\n")
+
+    def page_size(self):
+        """Bir sayfadaki satır sayısı (TERMUS_PAGE_SIZE verilmemişse terminal yüksekliğine göre)"""
+        size = env_int("TERMUS_PAGE_SIZE", 0)
+        if size <= 0:
+            size = shutil.get_terminal_size().lines - 8
+        return max(size, 5)
+
+    def show_playlist(self, page=None, index=None):
+        """Çalma listesinin bir sayfasını gösterir
+
+        Varsayılan olarak çalan şarkının sayfası gösterilir; index verilirse o sıradaki
+        şarkının sayfası. Yalnızca görünen sayfa biçimlendirilir.
+        """
+        size = self.page_size()
+        if page is None:
+            page = (self.current_song_index if index is None else index) // size
+        page, pages, start, end = page_window(page, len(self.playlist), size)
+        self.list_page = page
+        
+        title = f"Çalma Listesi (sayfa {page + 1}/{pages})" if pages > 1 else "Çalma Listesi"
         if COLORAMA_AVAILABLE:
-            print(f"\n{Fore.CYAN}==== Çalma Listesi ===={Style.RESET_ALL}")
+            print(f"\n{Fore.CYAN}==== {title} ===={Style.RESET_ALL}")
         else:
-            print("\n==== Çalma Listesi ====")
+            print(f"\n==== {title} ====")
             
+        if self.is_scanning():
+            self.print_info(f"Tarama sürüyor, şimdilik {len(self.playlist)} dosya bulundu.")
         if not self.playlist:
             print("Çalma listesi boş")
         else:
-            for i, song in enumerate(self.playlist):
-                if i == self.current_song_index:
-                    if COLORAMA_AVAILABLE:
-                        prefix = f"{Fore.GREEN}► "
-                    else:
-                        prefix = "► "
-                else:
-                    prefix = "  "
-                    
-                if COLORAMA_AVAILABLE:
-                    print(f"{prefix}{i+1}. {Fore.WHITE}{os.path.basename(song)}")
-                else:
-                    print(f"{prefix}{i+1}. {os.path.basename(song)}")
+            # Sayfa tek metin olarak hazırlanıp tek seferde yazılır
+            if COLORAMA_AVAILABLE:
+                current, other, name_style = f"{Fore.GREEN}► ", "  ", Fore.WHITE
+            else:
+                current, other, name_style = "► ", "  ", ""
+            lines = [f"{current if i - 1 == self.current_song_index else other}{i}. {name_style}{name}"
+                     for i, name in enumerate(self.playlist.file_names(start, end), start + 1)]
+            print("\n".join(lines))
+            if pages > 1:
+                print(f"({start + 1}-{end} / {len(self.playlist)}; list +/-: sayfa, list [sıra]: şarkıya git)")
                     
         if COLORAMA_AVAILABLE:
             print(f"{Fore.CYAN}====================={Style.RESET_ALL}\n")
         else:
             print("=====================\n")
 
+    def show_artists(self, page=0):
+        """Sanatçıların bir sayfasını albüm ve şarkı sayılarıyla gösterir"""
+        artists = self.search_index.artist_list()
+        page, pages, start, end = page_window(page, len(artists), self.page_size())
+        self.artists_page = page
+        
+        title = f"Sanatçılar ({len(artists)}, sayfa {page + 1}/{pages})"
+        if COLORAMA_AVAILABLE:
+            print(f"\n{Fore.CYAN}==== {title} ===={Style.RESET_ALL}")
+            name_style, reset = Fore.GREEN, Style.RESET_ALL
+        else:
+            print(f"\n==== {title} ====")
+            name_style = reset = ""
+        if not artists:
+            print("Henüz sanatçı yok")
+        else:
+            print("\n".join(f"{name_style}{name}{reset} ({albums} albüm, {tracks} şarkı)"
+                            for name, albums, tracks in artists[start:end]))
+            hint = "albums [sanatçı]: albümleri göster"
+            print(f"(artists +/-: sayfa, {hint})" if pages > 1 else f"({hint})")
+        print()
 
-def main():
+    def show_albums(self, page=0, artist=None):
+        """Albümlerin (artist verilirse yalnızca o sanatçınınkilerin) bir sayfasını gösterir"""
+        albums = self.search_index.album_list(artist)
+        page, pages, start, end = page_window(page, len(albums), self.page_size())
+        self.albums_page = page
+        self.albums_artist = artist
+        
+        title = f"Albümler{f' - {artist}' if artist else ''} ({len(albums)}, sayfa {page + 1}/{pages})"
+        if COLORAMA_AVAILABLE:
+            print(f"\n{Fore.CYAN}==== {title} ===={Style.RESET_ALL}")
+            name_style, reset = Fore.GREEN, Style.RESET_ALL
+        else:
+            print(f"\n==== {title} ====")
+            name_style = reset = ""
+        if not albums:
+            print("Albüm bulunamadı")
+        else:
+            print("\n".join(f"{artist_name} - {name_style}{album}{reset} ({tracks} şarkı)"
+                            for artist_name, album, tracks in albums[start:end]))
+            hint = "album [ad]: albümü sıraya ekle"
+            print(f"(albums +/-: sayfa, {hint})" if pages > 1 else f"({hint})")
+        print()
+
+    def enqueue_album(self, query):
+        """Adı sorguya uyan albümün şarkılarını çalma sırasına ekler"""
+        matches = self.search_index.find_albums(query)
+        if not matches:
+            self.print_warning("Albüm bulunamadı.")
+            return
+        if len(matches) > 1:
+            self.print_warning(f"{len(matches)} albüm bulundu, 'album [sanatçı] - [albüm]' ile seçin:")
+            for artist, album, paths in matches[:self.page_size()]:
+                print(f"  {artist} - {album} ({len(paths)} şarkı)")
+            return
+        
+        artist, album, paths = matches[0]
+        paths = [path for path in paths if self.find_song(path) is not None]
+        if COLORAMA_AVAILABLE:
+            print(f"\n{Fore.YELLOW}==== {artist} - {album} ===={Style.RESET_ALL}")
+        else:
+            print(f"\n==== {artist} - {album} ====")
+        print("\n".join(f"{i}. {os.path.basename(path)}" for i, path in enumerate(paths, 1)))
+        
+        self.play_queue.extend(paths)
+        self.print_success(f"{len(paths)} şarkı sıraya eklendi.")
+        self.start_queue()
+
+    def start_queue(self):
+        """Çalma sırası çalmıyorsa sıradaki ilk şarkıyı başlatır, çalıyorsa mpv'nin sırasını yeniler"""
+        if self.playing:
+            # mpv'nin listesindeki sıradaki şarkı artık sıranın ilk şarkısı
+            self.queue_next()
+            return
+        index = self.queue_head_index()
+        if index is not None:
+            self.play_queue.popleft()
+            self.current_song_index = index
+            self.play()
+
+    def save_playlist(self, path):
+        """Çalma sırasını (boşsa tüm çalma listesini) M3U8 dosyasına yazar"""
+        path = os.path.expanduser(path.strip())
+        if not path:
+            self.print_warning("Kullanım: save [dosya.m3u8]")
+            return
+        if self.play_queue:
+            current = [self.playlist[self.current_song_index]] if self.playing else []
+            tracks = itertools.chain(current, self.play_queue)
+        else:
+            tracks = iter(self.playlist)
+        try:
+            count = write_m3u(path, tracks)
+        except OSError as e:
+            self.print_error(f"Liste kaydedilemedi: {e}")
+            return
+        self.print_success(f"{count} şarkı {path} dosyasına kaydedildi.")
+
+    def load_playlist(self, path):
+        """M3U/M3U8 dosyasındaki kütüphanede bulunan şarkıları çalma sırasına koyar"""
+        path = os.path.expanduser(path.strip())
+        if not path:
+            self.print_warning("Kullanım: load [dosya.m3u]")
+            return
+        queue = deque()
+        missing = 0
+        try:
+            # Dosya satır satır okunur, bulunan yollar doğrudan yeni sıraya eklenir
+            for track in read_m3u(path):
+                if self.find_song(track) is None:
+                    missing += 1
+                else:
+                    queue.append(track)
+        except OSError as e:
+            # Okunamayan liste mevcut sırayı değiştirmez
+            self.print_error(f"Liste okunamadı: {e}")
+            return
+        if missing:
+            self.print_warning(f"{missing} şarkı kütüphanede bulunamadı.")
+        if not queue:
+            self.print_warning("Listede çalınabilecek şarkı yok.")
+            return
+        self.play_queue = queue
+        self.print_success(f"{len(self.play_queue)} şarkı sıraya eklendi.")
+        self.start_queue()
+
+    def history_start(self, path):
+        """Şarkının çalmaya başladığını geçmişe kaydeder"""
+        self.history.record("play", path)
+        self.history_path = path
+
+    def history_finish(self, kind):
+        """Çalan şarkının sonucunu ("skip" ya da "complete") geçmişe kaydeder"""
+        if self.history_path is not None:
+            position = self.player.properties.get('time-pos') if kind == "skip" else None
+            self.history.record(kind, self.history_path, position)
+            self.history_path = None
+
+    def show_history(self, kind, limit=None):
+        """top/recent: sorguyu geçmiş thread'inde çalıştırır, sonuç gelince gösterir"""
+        task = self.loop.create_task(self.history_view(kind, limit or self.page_size()))
+        task.add_done_callback(self.report_task_error)
+
+    async def history_view(self, kind, limit):
+        """En çok ya da son çalınan şarkıları gösterir"""
+        self.print_history(kind, await self.history_rows(kind, limit))
+
+    def history_rows(self, kind, limit):
+        """top/recent sorgusunu geçmiş thread'inde başlatır, sonucu bekleyen future'ı döndürür"""
+        query = self.history.top if kind == "top" else self.history.recent
+        return asyncio.wrap_future(self.history.query(query, limit))
+
+    def print_history(self, kind, rows):
+        """En çok ya da son çalınan şarkıların listesini yazdırır"""
+        title = "En Çok Çalınanlar" if kind == "top" else "Son Çalınanlar"
+        if COLORAMA_AVAILABLE:
+            print(f"\n{Fore.CYAN}==== {title} ===={Style.RESET_ALL}")
+        else:
+            print(f"\n==== {title} ====")
+        if not rows:
+            print("Henüz çalma geçmişi yok")
+        elif kind == "top":
+            print("\n".join(f"{i}. {os.path.basename(path)} ({plays} kez, {completes} tamamlandı, {skips} atlandı)"
+                            for i, (path, plays, skips, completes) in enumerate(rows, 1)))
+        else:
+            print("\n".join(f"{time.strftime('%d.%m %H:%M', time.localtime(when))}  {os.path.basename(path)}"
+                            for when, path in rows))
+        print()
+
+    def show_queue(self, clear=False):
+        """Çalma sırasını gösterir ya da temizler"""
+        if clear:
+            self.play_queue.clear()
+            if self.playing:
+                self.queue_next()
+            self.print_info("Çalma sırası temizlendi.")
+            return
+        if not self.play_queue:
+            self.print_info("Çalma sırası boş. 'album [ad]' ile albüm ekleyebilirsiniz.")
+            return
+        size = self.page_size()
+        if COLORAMA_AVAILABLE:
+            print(f"\n{Fore.CYAN}==== Çalma Sırası ({len(self.play_queue)}) ===={Style.RESET_ALL}")
+        else:
+            print(f"\n==== Çalma Sırası ({len(self.play_queue)}) ====")
+        print("\n".join(f"{i}. {os.path.basename(path)}"
+                        for i, path in enumerate(itertools.islice(self.play_queue, size), 1)))
+        if len(self.play_queue) > size:
+            print(f"... ve {len(self.play_queue) - size} şarkı daha")
+        print()
+
+
+def run_command(player, line):
+    """Komut istemine yazılan tek bir komutu çalıştırır"""
+    # Komutlar büyük/küçük harf duyarsız, dizin yolları değil
+    command = line.lower()
+    if command in ["play", "p"]:
+        player.play()
+    
+    elif command.startswith(("play ", "p ")) and command.split(None, 1)[1].isdigit():
+        player.play_index(int(command.split(None, 1)[1]) - 1)
+    
+    elif command in ["stop", "s"]:
+        player.stop()
+    
+    elif command == "pause":
+        player.toggle_pause()
+    
+    elif command.startswith("seek "):
+        try:
+            player.seek(float(command[5:]))
+        except ValueError:
+            player.print_error("Geçersiz süre. Örnek: seek 30 veya seek -10")
+    
+    elif command in ["next", "n"]:
+        # next_song/prev_song çalıyorsa şarkıyı kendisi başlatır, tek geçiş olur
+        player.next_song()
+    
+    elif command == "prev":
+        player.prev_song()
+    
+    elif command in ["vol+", "v+"]:
+        player.volume_up()
+    
+    elif command in ["vol-", "v-"]:
+        player.volume_down()
+        
+    elif command.startswith("vol "):
+        try:
+            volume = int(command[4:])
+            player.set_volume(volume)
+        except ValueError:
+            player.print_error("Geçersiz ses seviyesi. 0-100 arasında bir değer girin.")
+    
+    elif command == "shuffle":
+        player.shuffle()
+        
+    elif command in ["repeat", "r"]:
+        player.toggle_repeat_mode()
+        
+    elif command.startswith("search "):
+        query = command[7:].strip()
+        if query:
+            player.search_song(query)
+        else:
+            player.print_warning("Arama sorgusu giriniz.")
+    
+    elif command in ["info", "i"]:
+        player.show_song_info()
+    
+    elif command in ["list", "l"]:
+        player.show_playlist()
+    
+    elif command in ["list +", "l +"]:
+        player.show_playlist(page=player.list_page + 1)
+    
+    elif command in ["list -", "l -"]:
+        player.show_playlist(page=player.list_page - 1)
+    
+    elif command.startswith(("list ", "l ")) and command.split(None, 1)[1].isdigit():
+        player.show_playlist(index=int(command.split(None, 1)[1]) - 1)
+    
+    elif command == "artists":
+        player.show_artists()
+    
+    elif command in ["artists +", "artists -"]:
+        player.show_artists(player.artists_page + (1 if command.endswith("+") else -1))
+    
+    elif command == "albums":
+        player.show_albums()
+    
+    elif command in ["albums +", "albums -"]:
+        player.show_albums(player.albums_page + (1 if command.endswith("+") else -1), player.albums_artist)
+    
+    elif command.startswith("albums "):
+        player.show_albums(artist=line[7:].strip())
+    
+    elif command.startswith("album "):
+        player.enqueue_album(line[6:])
+    
+    elif command == "dupes":
+        player.find_duplicates()
+    
+    elif command in ["dupes hide", "dupes show"]:
+        player.find_duplicates(hide=command.endswith("hide"))
+    
+    elif command.startswith("save "):
+        player.save_playlist(line[5:])
+    
+    elif command.startswith("load "):
+        player.load_playlist(line[5:])
+    
+    elif command == "wave":
+        player.toggle_waveform()
+    
+    elif command in ["top", "recent"]:
+        player.show_history(command)
+    
+    elif command.startswith(("top ", "recent ")) and command.split(None, 1)[1].isdigit():
+        name, count = command.split(None, 1)
+        player.show_history(name, int(count))
+    
+    elif command == "queue":
+        player.show_queue()
+    
+    elif command == "queue clear":
+        player.show_queue(clear=True)
+    
+    elif command.startswith("dir "):
+        new_dir = line[4:].strip()
+        if new_dir.startswith("~"):
+            new_dir = os.path.expanduser(new_dir)
+        player.set_music_dir(new_dir)
+    
+    elif command.startswith("dir+ "):
+        player.add_music_dir(os.path.expanduser(line[5:].strip()))
+    
+    elif command.startswith("dir- "):
+        player.remove_music_dir(line[5:].strip())
+    
+    elif command == "dirs":
+        player.show_music_dirs()
+    
+    elif command in ["refresh"]:
+        player.refresh_playlist()
+    
+    elif command == "tags":
+        player.scan_tags()
+    
+    elif command == "tags stop":
+        player.scan_tags(cancel=True)
+    
+    elif command == "watch":
+        player.toggle_watch()
+    
+    elif command in ["current", "c"]:
+        status = "çalıyor" if player.playing else "durduruldu"
+        player.print_info(f"Şarkı: {player.get_current_song_name()}")
+        player.print_info(f"Durum: {status}")
+        player.print_info(f"Ses seviyesi: %{player.volume}")
+    
+    elif command == "stats":
+        player.show_stats()
+    
+    elif command in ["help", "h"]:
+        player.show_help()
+    
+    elif command in ["quit", "q", "exit"]:
+        print("Çıkış yapılıyor...")
+        player.quit()
+    
+    else:
+        player.print_warning("Bilinmeyen komut. Yardım için 'help' yazın.")
+        return False
+    return True
+
+
+def control_socket_path():
+    """TERMUS_CONTROL ayarlıysa kontrol soketinin yolu (1 ise varsayılan yol), değilse None"""
+    value = os.environ.get("TERMUS_CONTROL")
+    if not value or value == "0":
+        return None
+    if value == "1":
+        return os.path.join(os.environ.get("XDG_RUNTIME_DIR") or cache_dir(), "termus.sock")
+    return os.path.expanduser(value)
+
+
+class ControlServer:
+    """Termus'u yerel bir Unix soketinden yöneten komut sunucusu (TERMUS_CONTROL).
+
+    Her satır komut istemindekiyle aynı bir komuttur ve her komuta sırayla bir JSON
+    satırıyla cevap verilir: {"ok": ..., "output": [...]}. 'state' oynatıcının durumunu,
+    'search' sonuçları çalma listesindeki sıralarıyla döndürür. İstemciler aynı anda
+    bağlanabilir ve birden çok komutu art arda gönderebilir; bir okumada gelen tüm
+    komutların cevapları tek yazmayla döner. 'top' ve 'recent' geçmiş sorgusu bitince
+    cevaplanır, bağlantının sonraki komutları sıra bozulmasın diye onu bekler.
+    """
+
+    SEARCH_LIMIT = 50
+    MAX_LINE = 1 << 16
+    ANSI = re.compile(r"\x1b\[[0-9;]*m")
+
+    def __init__(self, player, path):
+        self.player = player
+        self.path = path
+        self.server = None
+        self.clients = set()
+
+    async def start(self):
+        if os.path.exists(self.path):
+            # Önceki oturumdan kalan soketi sil, çalışan bir Termus'unkine dokunma
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.path)
+            except OSError:
+                os.unlink(self.path)
+            else:
+                raise OSError(errno.EADDRINUSE, "soket başka bir Termus tarafından kullanılıyor")
+            finally:
+                probe.close()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.server = await self.player.loop.create_unix_server(
+            functools.partial(ControlConnection, self), self.path)
+        os.chmod(self.path, 0o600)
+
+    def close(self):
+        if self.server is None:
+            return
+        self.server.close()
+        for client in list(self.clients):
+            client.transport.close()
+        self.server = None
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def handle(self, line):
+        """Tek komutu çalıştırır, cevabı sözlük olarak döndürür"""
+        name, _, argument = line.strip().partition(" ")
+        if name == "state":
+            return {"ok": True, "state": self.player.state()}
+        if name == "search":
+            # Komut istemindeki seçim beklemesine girmeden sonuçları döndür
+            results = []
+            for path in self.player.search_index.search(argument, limit=self.SEARCH_LIMIT):
+                index = self.player.find_song(path)
+                if index is not None:
+                    results.append({"index": index + 1, "path": path})
+            return {"ok": True, "results": results}
+        if name in ("top", "recent") and (not argument or argument.isdigit()):
+            # Sorgu geçmiş thread'inde çalışır; cevap sonuç gelince döner
+            return self.history(name, int(argument) if argument else None)
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            ok = run_command(self.player, line.strip())
+        return {"ok": ok, "output": self.ANSI.sub("", output.getvalue()).splitlines()}
+
+    async def history(self, kind, limit):
+        rows = await self.player.history_rows(kind, limit or self.player.page_size())
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.player.print_history(kind, rows)
+        return {"ok": True, "output": self.ANSI.sub("", output.getvalue()).splitlines()}
+
+
+class ControlConnection(asyncio.Protocol):
+    """Kontrol soketine bağlı tek istemci"""
+
+    def __init__(self, server):
+        self.server = server
+        self.transport = None
+        self.buffer = b""
+        self.lines = deque()
+        # Cevabı beklenen komut (top/recent); sonraki komutlar onun cevabından sonra çalışır
+        self.waiting = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.server.clients.add(self)
+
+    def connection_lost(self, exc):
+        self.server.clients.discard(self)
+        if self.waiting is not None:
+            self.waiting.cancel()
+
+    def data_received(self, data):
+        self.buffer += data
+        if b"\n" not in self.buffer:
+            if len(self.buffer) > self.server.MAX_LINE:
+                self.transport.close()
+            return
+        *lines, self.buffer = self.buffer.split(b"\n")
+        self.lines.extend(lines)
+        if self.waiting is None:
+            self.run_lines()
+
+    def run_lines(self):
+        """Bekleyen komutları sırayla çalıştırır, cevabı beklenen bir komutta durur"""
+        replies = []
+        while self.lines:
+            line = self.lines.popleft()
+            if self.server.player.closed.is_set():
+                self.lines.clear()
+                break
+            if not line.strip():
+                continue
+            try:
+                reply = self.server.handle(line.decode("utf-8", "replace"))
+            except Exception as e:
+                reply = {"ok": False, "error": str(e)}
+            if asyncio.iscoroutine(reply):
+                self.waiting = asyncio.ensure_future(reply)
+                self.waiting.add_done_callback(self.reply_ready)
+                break
+            replies.append(json.dumps(reply, ensure_ascii=False))
+        if replies:
+            self.transport.write(("\n".join(replies) + "\n").encode())
+
+    def reply_ready(self, future):
+        self.waiting = None
+        if future.cancelled() or self.transport.is_closing():
+            return
+        try:
+            reply = future.result()
+        except Exception as e:
+            reply = {"ok": False, "error": str(e)}
+        self.transport.write((json.dumps(reply, ensure_ascii=False) + "\n").encode())
+        self.run_lines()
+
+    # Cevapları okumayan istemcinin komutları da beklesin
+    def pause_writing(self):
+        self.transport.pause_reading()
+
+    def resume_writing(self):
+        self.transport.resume_reading()
+
+
+async def console():
+    """Komut istemini, mpv olaylarını ve zamanlayıcıları tek olay döngüsünde çalıştırır"""
+    loop = asyncio.get_running_loop()
     player = SimpleMusicPlayer()
+    screen = player.screen
+    screen.install()
+    
+    server = None
+    control_path = control_socket_path()
+    if control_path:
+        server = ControlServer(player, control_path)
+        try:
+            await server.start()
+            player.print_info(f"Kontrol soketi: {control_path}")
+        except OSError as e:
+            player.print_error(f"Kontrol soketi açılamadı: {e}")
+            server = None
     
     print("Komutları görmek için 'help' veya 'h' yazın.")
     
-    # Ana döngü
-    while True:
+    fd = sys.stdin.fileno()
+    pending = [b""]
+
+    def prompt():
+        # Arama sonucu seçilirken komut istemi önceki listenin hemen altında kalır
+        screen.show_prompt("> ", gap=player.search_results is None)
+
+    def handle_line(line):
         try:
-            command = input("\n> ").strip().lower()
-            
-            if command in ["play", "p"]:
-                player.play()
-            
-            elif command in ["stop", "s"]:
-                player.stop()
-            
-            elif command in ["next", "n"]:
-                player.next_song()
-                if player.playing:
-                    player.play()
-            
-            elif command == "prev":
-                player.prev_song()
-                if player.playing:
-                    player.play()
-            
-            elif command in ["vol+", "v+"]:
-                player.volume_up()
-            
-            elif command in ["vol-", "v-"]:
-                player.volume_down()
-                
-            elif command.startswith("vol "):
-                try:
-                    volume = int(command[4:])
-                    player.set_volume(volume)
-                except ValueError:
-                    player.print_error("Geçersiz ses seviyesi. 0-100 arasında bir değer girin.")
-            
-            elif command == "shuffle":
-                player.shuffle()
-                
-            elif command in ["repeat", "r"]:
-                player.toggle_repeat_mode()
-                
-            elif command.startswith("search "):
-                query = command[7:].strip()
-                if query:
-                    player.search_song(query)
-                else:
-                    player.print_warning("Arama sorgusu giriniz.")
-            
-            elif command in ["info", "i"]:
-                player.show_song_info()
-            
-            elif command in ["list", "l"]:
-                player.show_playlist()
-            
-            elif command.startswith("dir "):
-                new_dir = command[4:].strip()
-                if new_dir.startswith("~"):
-                    new_dir = os.path.expanduser(new_dir)
-                player.set_music_dir(new_dir)
-            
-            elif command in ["refresh"]:
-                player.refresh_playlist()
-            
-            elif command in ["current", "c"]:
-                status = "çalıyor" if player.playing else "durduruldu"
-                player.print_info(f"Şarkı: {player.get_current_song_name()}")
-                player.print_info(f"Durum: {status}")
-                player.print_info(f"Ses seviyesi: %{player.volume}")
-            
-            elif command in ["help", "h"]:
-                player.show_help()
-            
-            elif command in ["quit", "q", "exit"]:
-                print("Çıkış yapılıyor...")
-                player.stop()
-                player.stop_player_checker()
-                sys.exit(0)
-            
+            if player.search_results is not None:
+                player.choose_search_result(line)
             else:
-                player.print_warning("Bilinmeyen komut. Yardım için 'help' yazın.")
-                
-        except KeyboardInterrupt:
-            print("\nÇıkış yapmak için 'q' tuşuna basın.")
+                run_command(player, line.strip())
         except Exception as e:
             player.print_error(f"Hata: {e}")
+        if not player.closed.is_set():
+            prompt()
+
+    def on_input():
+        # Satırlar os.read ile okunur; tamponlu sys.stdin döngüden habersiz veri biriktirirdi
+        data = os.read(fd, 4096)
+        pending[0] += data
+        while b"\n" in pending[0] and not player.closed.is_set():
+            line, pending[0] = pending[0].split(b"\n", 1)
+            screen.input_received()
+            handle_line(line.decode(sys.stdin.encoding or "utf-8", "replace"))
+        if not data and not player.closed.is_set():
+            # Girdi kapandı (Ctrl-D veya yönlendirilmiş dosyanın sonu)
+            if pending[0].strip():
+                handle_line(pending[0].decode(sys.stdin.encoding or "utf-8", "replace"))
+                pending[0] = b""
+            if player.closed.is_set():
+                return
+            if server is not None:
+                # Başsız çalışma: komutlar yalnızca kontrol soketinden gelir
+                loop.remove_reader(fd)
+                print("\nKomut girişi kapandı, Termus kontrol soketinden yönetilebilir.")
+            else:
+                print("\nÇıkış yapılıyor...")
+                player.quit()
+        return bool(data)
+
+    def read_file():
+        if on_input() and not player.closed.is_set():
+            loop.call_soon(read_file)
+
+    def on_interrupt():
+        print("\nÇıkış yapmak için 'q' tuşuna basın.")
+        prompt()
+
+    try:
+        loop.add_reader(fd, on_input)
+    except PermissionError:
+        # Normal dosya ve /dev/null epoll ile izlenemez; okumak beklemediği için sırayla okunur
+        loop.call_soon(read_file)
+    loop.add_signal_handler(signal.SIGINT, on_interrupt)
+    prompt()
+    try:
+        await player.closed.wait()
+    finally:
+        loop.remove_reader(fd)
+        loop.remove_signal_handler(signal.SIGINT)
+        if server is not None:
+            server.close()
+        screen.uninstall()
+
+
+def main():
+    asyncio.run(console())
 
 
 if __name__ == "__main__":
@@ -622,9 +4376,4 @@ if __name__ == "__main__":
         main()
     except KeyboardInterrupt:
         print("\nProgram sonlandırıldı.")
-        # Temizleme işlemleri
-        try:
-            subprocess.run(['killall', 'mpv'], stderr=subprocess.DEVNULL)
-        except:
-            pass
         sys.exit(0)
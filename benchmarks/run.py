@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""Termus performans ölçümleri.
+
+Sentetik bir kütüphane üretir, Termus'u sahte mpv (tools/fake_mpv.py) ile
+çalıştırır ve başlangıç, tarama, arama, etiket okuma, şarkı geçişi, kopya arama
+ve bellek ölçümlerini JSON olarak yazar. Sonuçlar kayıtlı bir temel ölçümle karşılaştırılabilir:
+
+    python3 benchmarks/run.py --tracks 20000 --output sonuc.json
+    python3 benchmarks/run.py --tracks 20000 --baseline sonuc.json
+
+Tüm ölçümlerde küçük değer daha iyidir. --baseline verildiğinde eşikten
+(--threshold, varsayılan %20) fazla yavaşlayan ölçüm varsa çıkış kodu 1 olur.
+
+Şarkı geçişi komut isteminin yolundan ('next' komutu) ölçülür. Bir komut mpv'ye
+birden fazla dosya yükletirse veya geçişlerin %95'i --max-switch-ms (varsayılan
+50 ms) içinde bitmezse de çıkış kodu 1 olur.
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import shutil
+import argparse
+import platform
+import resource
+import tempfile
+import statistics
+import tracemalloc
+import contextlib
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+FAKE_MPV = os.path.join(ROOT, "tools", "fake_mpv.py")
+
+QUERIES = ["love", "night fire", "artist:0042", "album:gold", "dre", "summer rain heart",
+           "ocaen", "title:storm echo", "l", "zzzz"]
+# Bundan küçük mutlak farklar ölçüm gürültüsü sayılır (ms ve MB)
+MIN_DELTA = 1.0
+
+
+@contextlib.contextmanager
+def quiet():
+    """Ölçüm sırasında Termus'un çıktısını gizler"""
+    saved = sys.stdout
+    with open(os.devnull, "w") as devnull:
+        sys.stdout = devnull
+        try:
+            yield
+        finally:
+            sys.stdout = saved
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return (time.perf_counter() - start) * 1000, result
+
+
+async def wait_for(condition, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise RuntimeError("zaman aşımı")
+        await asyncio.sleep(0.001)
+
+
+def setup_environment(workdir, tracks, depth, real_ratio):
+    """HOME, önbellek ve mpv'yi geçici dizine yönlendirir, kütüphaneyi üretir"""
+    sys.path.insert(0, HERE)
+    import synth
+
+    os.environ["HOME"] = workdir
+    os.environ["XDG_CACHE_HOME"] = os.path.join(workdir, "cache")
+    os.environ["TERMUS_MPV"] = FAKE_MPV
+    os.environ["FAKE_MPV_DURATION"] = "3600"
+    music_dir = os.path.join(workdir, "Müzik")
+    start = time.perf_counter()
+    paths = synth.generate(music_dir, tracks, depth, real_ratio=real_ratio)
+    return music_dir, paths, time.perf_counter() - start
+
+
+def close_player(player):
+    with quiet():
+        player.tag_scanner.cancel()
+        if player.tag_scanner.thread is not None:
+            player.tag_scanner.thread.join()
+        player.quit()
+
+
+def library_ready(player):
+    return not player.is_scanning() and not player.search_index.is_building()
+
+
+async def bench_startup(termus, results):
+    """Soğuk (boş indeks) ve ılık (dolu indeks) açılış: komut istemine ve kütüphanenin hazır olmasına kadar"""
+    with quiet():
+        results["startup_cold_ms"], player = timed(termus.SimpleMusicPlayer)
+        start = time.perf_counter()
+        await wait_for(lambda: library_ready(player))
+        results["library_ready_cold_ms"] = (time.perf_counter() - start) * 1000
+    close_player(player)
+
+    with quiet():
+        results["startup_warm_ms"], player = timed(termus.SimpleMusicPlayer)
+        start = time.perf_counter()
+        await wait_for(lambda: library_ready(player))
+        results["library_ready_warm_ms"] = (time.perf_counter() - start) * 1000
+        # Etiket okuyan işlemler sonraki ölçümlerle işlemci için yarışmasın
+        await wait_for(lambda: not player.tag_scanner.is_running(), timeout=600)
+    return player
+
+
+async def timed_refresh(player):
+    start = time.perf_counter()
+    await player.refresh_playlist()
+    return (time.perf_counter() - start) * 1000
+
+
+async def bench_refresh(player, paths, results, repeat):
+    with quiet():
+        samples = []
+        for _ in range(repeat):
+            samples.append(await timed_refresh(player))
+            # Arka planda yeniden kurulan arama indeksi sonraki ölçümü etkilemesin
+            await wait_for(lambda: library_ready(player))
+        results["refresh_warm_ms"] = min(samples)
+
+        # Tek dizinde değişiklik: yalnızca o dizin yeniden taranmalı
+        extra = os.path.join(os.path.dirname(paths[len(paths) // 2]), "99 - Benchmark Extra.mp3")
+        open(extra, "wb").close()
+        results["refresh_one_dir_ms"] = await timed_refresh(player)
+        os.unlink(extra)
+        await player.refresh_playlist()
+        await wait_for(lambda: library_ready(player))
+
+
+def bench_search(player, results, repeat):
+    per_query = []
+    for query in QUERIES:
+        per_query.append(min(timed(player.search_index.search, query, player.SEARCH_LIMIT)[0]
+                             for _ in range(repeat)))
+    results["search_median_ms"] = statistics.median(per_query)
+    results["search_max_ms"] = max(per_query)
+
+
+def bench_tags(termus, formats, music_dir, workdir, results):
+    """Etiketleri boş bir indeksle baştan okur"""
+    if not termus.MUTAGEN_AVAILABLE:
+        return
+    library = termus.LibraryIndex(formats, os.path.join(workdir, "tags.db"))
+    library.scan(music_dir)
+    scanner = termus.TagScanner(library)
+    start = time.perf_counter()
+    scanner.start()
+    scanner.thread.join()
+    results["tag_scan_ms"] = (time.perf_counter() - start) * 1000
+    results["tag_scan_files"] = scanner.done
+
+
+async def bench_track_switch(termus, player, results, switches):
+    """next komutundan mpv'nin yeni dosyayı bildirmesine kadar geçen süre
+
+    Komut, komut istemindeki gibi run_command ile verilir; her komutun mpv'ye
+    yüklettiği dosya sayısı sayılır ve en çok geçiş sayısı olarak döndürülür.
+    """
+    changed = asyncio.Event()
+    expected = [None]
+    handler = player.player.on_event
+    loadfile = player.player.loadfile
+    loads = [0]
+
+    def counting_loadfile(path, mode="replace"):
+        if mode == "replace":
+            loads[0] += 1
+        loadfile(path, mode)
+
+    def on_event(event):
+        handler(event)
+        if event.get("event") == "property-change" and event.get("name") == "path" \
+                and event.get("data") == expected[0]:
+            changed.set()
+
+    player.player.on_event = on_event
+    player.player.loadfile = counting_loadfile
+    samples = []
+    transitions = 0
+    with quiet():
+        player.current_song_index = 0
+        expected[0] = player.playlist[0]
+        player.play()
+        await asyncio.wait_for(changed.wait(), 5)
+        for _ in range(switches):
+            changed.clear()
+            loads[0] = 0
+            expected[0] = player.playlist[(player.current_song_index + 1) % len(player.playlist)]
+            start = time.perf_counter()
+            termus.run_command(player, "next")
+            await asyncio.wait_for(changed.wait(), 5)
+            samples.append((time.perf_counter() - start) * 1000)
+            # Geç gelen bir ikinci yüklemeyi de yakalamak için olayların işlenmesini bekle
+            await asyncio.sleep(0.01)
+            transitions = max(transitions, loads[0])
+        player.stop()
+    player.player.on_event = handler
+    player.player.loadfile = loadfile
+    samples.sort()
+    results["track_switch_median_ms"] = statistics.median(samples)
+    results["track_switch_p95_ms"] = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    results["track_switch_max_ms"] = samples[-1]
+    return transitions
+
+
+def bench_dupes(termus, player, results):
+    """Kopya aramasını özet önbelleği boşken ve doluyken ölçer"""
+    finder = termus.DuplicateFinder(player.library)
+    with player.library.lock, player.library.db:
+        player.library.db.execute("DELETE FROM hashes")
+    results["dupes_cold_ms"], groups = timed(finder.find, player.root_paths())
+    results["dupes_warm_ms"] = min(timed(finder.find, player.root_paths())[0] for _ in range(3))
+    results["dupes_files"] = sum(len(paths) for _, paths in groups)
+
+
+def bench_memory(termus, player, results):
+    records = player.library_records(player.root_paths())
+    paths = [record[0] for record in records]
+    tracemalloc.start()
+    table = termus.TrackTable(paths)
+    results["playlist_mb"] = tracemalloc.get_traced_memory()[0] / 1e6
+    tracemalloc.stop()
+    del table
+    # Linux'ta ru_maxrss KB cinsindendir
+    results["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def run_all(termus, args, music_dir, paths, workdir, results):
+    """Termus olay döngüsünde çalıştığı için ölçümler de döngü içinde yapılır"""
+    player = await bench_startup(termus, results)
+    await bench_refresh(player, paths, results, args.repeat)
+    bench_search(player, results, args.repeat)
+    transitions = await bench_track_switch(termus, player, results, args.switches)
+    bench_dupes(termus, player, results)
+    bench_memory(termus, player, results)
+    close_player(player)
+    bench_tags(termus, player.supported_formats, music_dir, workdir, results)
+    return transitions
+
+
+def compare(results, baseline, threshold):
+    """Temel ölçümle karşılaştırır, eşiği aşan gerilemelerin adlarını döndürür"""
+    regressions = []
+    print(f"\n{'ölçüm':<26}{'temel':>12}{'şimdi':>12}{'fark':>9}")
+    for name, value in results.items():
+        old = baseline.get(name)
+        if not isinstance(value, (int, float)) or not isinstance(old, (int, float)):
+            continue
+        change = (value - old) / old if old else 0.0
+        mark = ""
+        if change > threshold and value - old > MIN_DELTA and not name.endswith("_files"):
+            regressions.append(name)
+            mark = "  <-- yavaşladı"
+        print(f"{name:<26}{old:>12.3f}{value:>12.3f}{change:>+9.0%}{mark}")
+    return regressions
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Termus performans ölçümleri")
+    parser.add_argument("--tracks", type=int, default=5000)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--real-ratio", type=float, default=0.05)
+    parser.add_argument("--repeat", type=int, default=5, help="tekrarlanan ölçümlerde deneme sayısı")
+    parser.add_argument("--switches", type=int, default=20, help="ölçülecek şarkı geçişi sayısı")
+    parser.add_argument("--output", help="sonuçların yazılacağı JSON dosyası")
+    parser.add_argument("--baseline", help="karşılaştırılacak önceki JSON sonucu")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--max-switch-ms", type=float, default=50.0,
+                        help="şarkı geçişinin p95 üst sınırı (ms)")
+    parser.add_argument("--keep", action="store_true", help="geçici dizini silme")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="termus-bench-")
+    try:
+        music_dir, paths, generate_time = setup_environment(workdir, args.tracks, args.depth,
+                                                            args.real_ratio)
+        sys.path.insert(0, ROOT)
+        import Termus as termus
+
+        results = {}
+        transitions = asyncio.run(run_all(termus, args, music_dir, paths, workdir, results))
+    finally:
+        if args.keep:
+            print(f"Geçici dizin: {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "tracks": len(paths),
+            "depth": args.depth,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "mutagen": termus.MUTAGEN_AVAILABLE,
+            "generate_s": round(generate_time, 3),
+        },
+        "results": {name: round(value, 3) for name, value in results.items()},
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    failed = False
+    if transitions != 1:
+        print(f"[HATA] Bir 'next' komutu {transitions} şarkı geçişi yaptı (beklenen 1).")
+        failed = True
+    if results["track_switch_p95_ms"] > args.max_switch_ms:
+        print(f"[HATA] Şarkı geçişi p95 {results['track_switch_p95_ms']:.1f} ms, "
+              f"sınır {args.max_switch_ms:.0f} ms.")
+        failed = True
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("meta", {}).get("tracks") != report["meta"]["tracks"]:
+            print("[UYARI] Temel ölçüm farklı sayıda dosya ile alınmış.")
+        regressions = compare(report["results"], baseline.get("results", {}), args.threshold)
+        if regressions:
+            print(f"[HATA] Yavaşlayan ölçümler: {', '.join(regressions)}")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
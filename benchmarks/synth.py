@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Performans ölçümleri için sentetik müzik kütüphanesi üretir.
+
+Dizin yapısı: <kök>/Sanatçı NNNN/Albüm NN/NN - Şarkı.(mp3|wav)
+Dosyaların bir kısmı gerçek (küçük, geçerli) WAV ve ID3 etiketli MP3 dosyalarıdır;
+geri kalanı yalnızca tarama ölçümleri için boş dosyadır.
+
+    python3 benchmarks/synth.py /tmp/kutuphane --tracks 20000 --depth 2
+"""
+
+import os
+import sys
+import wave
+import struct
+import random
+import argparse
+
+WORDS = ("love night fire river blue gold dream heart rain summer shadow light "
+         "road city star moon silver wild ocean dance storm echo ghost paper").split()
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz, mono; sıfır veri sessizlik olarak çözülür
+MP3_FRAME = b"\xff\xfb\x90\xc4" + b"\x00" * 413
+
+
+def _syncsafe(size):
+    return bytes(((size >> shift) & 0x7F) for shift in (21, 14, 7, 0))
+
+
+def id3_tag(artist, title, album):
+    """ID3v2.3 etiketi (TPE1, TIT2, TALB) oluşturur"""
+    frames = b""
+    for frame_id, text in (("TPE1", artist), ("TIT2", title), ("TALB", album)):
+        data = b"\x01" + text.encode("utf-16")
+        frames += frame_id.encode() + struct.pack(">I", len(data)) + b"\x00\x00" + data
+    return b"ID3\x03\x00\x00" + _syncsafe(len(frames)) + frames
+
+
+def write_mp3(path, artist, title, album, frames=8):
+    with open(path, "wb") as f:
+        f.write(id3_tag(artist, title, album))
+        f.write(MP3_FRAME * frames)
+
+
+def write_wav(path, seconds=0.25, rate=8000):
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(b"\x00\x00" * int(seconds * rate))
+
+
+def title_words(rng, count):
+    return " ".join(rng.choice(WORDS).capitalize() for _ in range(count))
+
+
+def generate(root, tracks=1000, depth=2, per_dir=12, real_ratio=0.1, seed=1):
+    """root altında yaklaşık `tracks` dosyalık kütüphane üretir, oluşturulan yolları döndürür
+
+    depth: 1 = Sanatçı/şarkı, 2 = Sanatçı/Albüm/şarkı, 3+ = ek ara dizinler
+    real_ratio: içeriği gerçek WAV/MP3 olan dosyaların oranı
+    """
+    rng = random.Random(seed)
+    paths = []
+    dir_count = max(1, (tracks + per_dir - 1) // per_dir)
+    for d in range(dir_count):
+        artist = f"Artist {d // 10:04d} {title_words(rng, 1)}"
+        parts = [artist]
+        if depth >= 2:
+            parts.append(f"Album {d % 10:02d} {title_words(rng, 2)}")
+        for level in range(3, depth + 1):
+            parts.append(f"Disc {level - 2}")
+        directory = os.path.join(root, *parts)
+        os.makedirs(directory, exist_ok=True)
+
+        album = parts[1] if depth >= 2 else "Singles"
+        for t in range(min(per_dir, tracks - len(paths))):
+            title = title_words(rng, 3)
+            real = rng.random() < real_ratio
+            ext = ".wav" if real and t % 2 else ".mp3"
+            path = os.path.join(directory, f"{t + 1:02d} - {title}{ext}")
+            if real and ext == ".wav":
+                write_wav(path)
+            elif real:
+                write_mp3(path, artist, title, album)
+            else:
+                open(path, "wb").close()
+            paths.append(path)
+    return paths
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Sentetik müzik kütüphanesi üretir")
+    parser.add_argument("root")
+    parser.add_argument("--tracks", type=int, default=1000)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--per-dir", type=int, default=12)
+    parser.add_argument("--real-ratio", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    paths = generate(args.root, args.tracks, args.depth, args.per_dir, args.real_ratio, args.seed)
+    print(f"{len(paths)} dosya oluşturuldu: {args.root}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""Ses çalmadan mpv'nin JSON IPC arayüzünü taklit eden sahte mpv.
+
+Termus'u gerçek ses aygıtı olmadan çalıştırmak için kullanılır:
+
+    TERMUS_MPV=tools/fake_mpv.py ./Termus.py
+
+Ortam değişkenleri:
+    FAKE_MPV_DURATION  WAV olmayan dosyalar için parça süresi (sn, varsayılan 180)
+    FAKE_MPV_SPEED     Zamanın akış hızı çarpanı (varsayılan 1.0)
+"""
+
+import os
+import sys
+import json
+import time
+import wave
+import socket
+import selectors
+
+TICK = 0.05
+
+
+class FakeMpv:
+    def __init__(self, socket_path, volume=100):
+        self.socket_path = socket_path
+        self.default_duration = float(os.environ.get("FAKE_MPV_DURATION", "180"))
+        self.speed = float(os.environ.get("FAKE_MPV_SPEED", "1.0"))
+        self.selector = selectors.DefaultSelector()
+        self.clients = {}
+        self.observers = []
+        self.last_values = {}
+        self.running = True
+
+        self.playlist = []
+        self.pos = -1
+        self.time_pos = 0.0
+        self.duration = None
+        self.props = {"volume": float(volume), "pause": False, "loop-file": "no"}
+
+    # --- Yardımcılar ---
+
+    def track_duration(self, path):
+        if path.lower().endswith(".wav"):
+            try:
+                with wave.open(path) as w:
+                    return w.getnframes() / float(w.getframerate() or 1)
+            except (OSError, wave.Error, EOFError):
+                pass
+        return self.default_duration
+
+    def get(self, name):
+        playing = 0 <= self.pos < len(self.playlist)
+        if name == "time-pos":
+            return self.time_pos if playing else None
+        if name == "duration":
+            return self.duration if playing else None
+        if name == "path":
+            return self.playlist[self.pos] if playing else None
+        if name == "filename":
+            return os.path.basename(self.playlist[self.pos]) if playing else None
+        if name == "idle-active":
+            return not playing
+        if name == "playlist-pos":
+            return self.pos if playing else -1
+        if name == "playlist-count":
+            return len(self.playlist)
+        if name == "percent-pos":
+            return 100.0 * self.time_pos / self.duration if playing and self.duration else None
+        if name in self.props:
+            return self.props[name]
+        raise KeyError(name)
+
+    def send(self, conn, message):
+        try:
+            conn.sendall(json.dumps(message).encode() + b"\n")
+        except OSError:
+            self.drop(conn)
+
+    def broadcast(self, message):
+        for conn in list(self.clients):
+            self.send(conn, message)
+
+    def notify(self):
+        """Gözlenen özellikler değiştiyse property-change olayı gönderir"""
+        for conn, obs_id, name in list(self.observers):
+            try:
+                value = self.get(name)
+            except KeyError:
+                continue
+            key = (conn, obs_id)
+            if key in self.last_values and self.last_values[key] == value:
+                continue
+            self.last_values[key] = value
+            self.send(conn, {"event": "property-change", "id": obs_id, "name": name, "data": value})
+
+    # --- Oynatma simülasyonu ---
+
+    def start(self, index):
+        self.pos = index
+        path = self.playlist[index]
+        self.time_pos = 0.0
+        self.broadcast({"event": "start-file", "playlist_entry_id": index + 1})
+        if not os.path.exists(path):
+            self.end("error")
+            self.advance()
+            return
+        self.duration = self.track_duration(path)
+        self.broadcast({"event": "file-loaded"})
+        self.broadcast({"event": "playback-restart"})
+
+    def end(self, reason):
+        if 0 <= self.pos < len(self.playlist):
+            self.broadcast({"event": "end-file", "reason": reason, "playlist_entry_id": self.pos + 1})
+
+    def go_idle(self):
+        self.pos = -1
+        self.duration = None
+        self.time_pos = 0.0
+        self.broadcast({"event": "idle"})
+
+    def advance(self):
+        if self.pos + 1 < len(self.playlist):
+            self.start(self.pos + 1)
+        else:
+            self.playlist = []
+            self.go_idle()
+
+    def tick(self, elapsed):
+        if self.pos < 0 or self.props["pause"]:
+            return
+        self.time_pos += elapsed * self.speed
+        if self.duration is not None and self.time_pos >= self.duration:
+            self.time_pos = self.duration
+            self.notify()
+            if self.props["loop-file"] not in ("no", False):
+                self.time_pos = 0.0
+                self.broadcast({"event": "playback-restart"})
+                return
+            self.end("eof")
+            self.advance()
+
+    # --- Komutlar ---
+
+    def handle(self, conn, request):
+        args = request.get("command", [])
+        reply = {"error": "success", "data": None}
+        try:
+            reply["data"] = self.execute(conn, args)
+        except KeyError:
+            reply["error"] = "property not found"
+        except (IndexError, ValueError, TypeError):
+            reply["error"] = "invalid parameter"
+        if "request_id" in request:
+            reply["request_id"] = request["request_id"]
+        self.send(conn, reply)
+
+    def execute(self, conn, args):
+        name = args[0]
+        if name == "loadfile":
+            path, mode = args[1], (args[2] if len(args) > 2 else "replace")
+            if mode == "replace":
+                self.end("stop")
+                self.playlist = [path]
+                self.start(0)
+            else:
+                self.playlist.append(path)
+                if mode == "append-play" and self.pos < 0:
+                    self.start(len(self.playlist) - 1)
+        elif name == "stop":
+            self.end("stop")
+            self.playlist = []
+            self.go_idle()
+        elif name == "quit":
+            self.running = False
+        elif name == "set_property":
+            if args[1] not in self.props:
+                raise KeyError(args[1])
+            self.props[args[1]] = args[2]
+        elif name == "get_property":
+            return self.get(args[1])
+        elif name == "cycle":
+            if args[1] == "pause":
+                self.props["pause"] = not self.props["pause"]
+        elif name == "seek":
+            if self.pos >= 0:
+                mode = args[2] if len(args) > 2 else "relative"
+                target = float(args[1]) + (self.time_pos if mode == "relative" else 0.0)
+                self.time_pos = max(0.0, min(target, self.duration or 0.0))
+                self.broadcast({"event": "seek"})
+                self.broadcast({"event": "playback-restart"})
+        elif name == "observe_property":
+            self.observers.append((conn, args[1], args[2]))
+        elif name == "unobserve_property":
+            self.observers = [o for o in self.observers if not (o[0] is conn and o[1] == args[1])]
+        elif name == "playlist-clear":
+            if self.pos >= 0:
+                self.playlist = [self.playlist[self.pos]]
+                self.pos = 0
+            else:
+                self.playlist = []
+        elif name == "playlist-remove":
+            index = self.pos if args[1] == "current" else int(args[1])
+            del self.playlist[index]
+            if index < self.pos:
+                self.pos -= 1
+        elif name == "playlist-next":
+            self.end("stop")
+            self.advance()
+        else:
+            raise ValueError(name)
+        return None
+
+    # --- Soket döngüsü ---
+
+    def drop(self, conn):
+        if conn in self.clients:
+            self.selector.unregister(conn)
+            del self.clients[conn]
+            self.observers = [o for o in self.observers if o[0] is not conn]
+            conn.close()
+
+    def serve(self):
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.socket_path)
+        server.listen(16)
+        self.selector.register(server, selectors.EVENT_READ)
+
+        last = time.monotonic()
+        try:
+            while self.running:
+                for key, _ in self.selector.select(TICK):
+                    if key.fileobj is server:
+                        conn, _ = server.accept()
+                        self.clients[conn] = b""
+                        self.selector.register(conn, selectors.EVENT_READ)
+                        continue
+                    conn = key.fileobj
+                    try:
+                        data = conn.recv(65536)
+                    except OSError:
+                        data = b""
+                    if not data:
+                        self.drop(conn)
+                        continue
+                    buffer = self.clients[conn] + data
+                    while b"\n" in buffer:
+                        line, buffer = buffer.split(b"\n", 1)
+                        if line.strip():
+                            try:
+                                self.handle(conn, json.loads(line))
+                            except ValueError:
+                                self.send(conn, {"error": "invalid parameter"})
+                    if conn in self.clients:
+                        self.clients[conn] = buffer
+                now = time.monotonic()
+                self.tick(now - last)
+                last = now
+                self.notify()
+        finally:
+            server.close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+
+def main(argv):
+    socket_path = None
+    volume = 100
+    for arg in argv:
+        if arg.startswith("--input-ipc-server="):
+            socket_path = arg.split("=", 1)[1]
+        elif arg.startswith("--volume="):
+            volume = float(arg.split("=", 1)[1])
+    if not socket_path:
+        print("fake_mpv: --input-ipc-server gerekli", file=sys.stderr)
+        return 1
+    FakeMpv(socket_path, volume).serve()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
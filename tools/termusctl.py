@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""Termus'a kontrol soketinden komut gönderir.
+
+Termus TERMUS_CONTROL=1 (ya da bir soket yolu) ile başlatılmış olmalıdır:
+
+    TERMUS_CONTROL=1 ./Termus.py
+    python3 tools/termusctl.py next "vol 40" state
+
+Komutlar tek bağlantıda art arda gönderilir, her birinin JSON cevabı bir satıra yazılır.
+Ortam değişkenleri:
+    TERMUS_CONTROL  Soket yolu (1 ise Termus'un varsayılan yolu)
+"""
+
+import os
+import sys
+import socket
+
+
+def socket_path():
+    value = os.environ.get("TERMUS_CONTROL", "1")
+    if value not in ("", "0", "1"):
+        return os.path.expanduser(value)
+    base = os.environ.get("XDG_RUNTIME_DIR")
+    if not base:
+        base = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "termus")
+    return os.path.join(base, "termus.sock")
+
+
+def main(argv):
+    if not argv:
+        print("kullanım: termusctl.py KOMUT [KOMUT ...]  (örn. state, next, 'vol 40')", file=sys.stderr)
+        return 2
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.connect(socket_path())
+    except OSError as e:
+        print(f"termusctl: Termus'a bağlanılamadı: {e}", file=sys.stderr)
+        return 1
+    with conn:
+        conn.sendall("".join(command + "\n" for command in argv).encode())
+        data = b""
+        while data.count(b"\n") < len(argv):
+            chunk = conn.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+    sys.stdout.write(data.decode())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))